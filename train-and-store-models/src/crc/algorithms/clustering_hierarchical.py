@@ -1,16 +1,17 @@
 import json
 from typing import Dict
 
-from scipy.cluster.hierarchy import linkage, to_tree
+import numpy as np
+from scipy.cluster.hierarchy import linkage
 
 from ...notifications.notifier import Notifier
 from ...task.task_entity import TaskCreateModel
-from ..entities.clustering_hierarchical_entity import ClusteringHierarchicalE
 from ..entities.index_entity import ModelIndex
 from ..repositories.clustering_hierarchical_repository import \
     ClusteringHierarchicalRepository
 from ..repositories.model_index_repository import ModelIndexRepository
 from ..source_builder.source_builder import SourceBuilder
+from .linkage_tree import linkage_tree_rows
 
 
 class ClusteringHierarchical:
@@ -30,10 +31,8 @@ class ClusteringHierarchical:
         # Calcular linkage jerárquico
         Z = linkage(points, **params)
 
-        # Construir árbol y guardar nodos
-        root_node, _ = to_tree(Z, rd=True)
-        node_map = {}
-        self._save_tree(root_node, id_model, point_ids, point_names, node_map)
+        # Guardar los nodos del árbol
+        self._save_tree(Z, id_model, point_ids, point_names)
         
         return id_model
     
@@ -53,31 +52,10 @@ class ClusteringHierarchical:
         self.model_index_repo.add(model)
         return model.id
 
-    def _save_tree(self, node, id_model: int, point_ids: list, point_names: list, node_map: dict, parent_id: int = None) -> int:
-        if node.is_leaf():
-            id_point = point_ids[node.id]
-            name = point_names[node.id]
-            height = 0.0
-        else:
-            id_point = None
-            name = f"node_{node.id}"
-            height = node.dist
-
-        h_node = ClusteringHierarchicalE(
-            id_model=id_model,
-            name=name,
-            height=height,
-            id_parent=parent_id,
-            id_point=id_point
-        )
-        self.hierarchical_repo.add(h_node)
-        node_map[node.id] = h_node.id
-
-        if not node.is_leaf():
-            self._save_tree(node.get_left(), id_model, point_ids, point_names, node_map, h_node.id)
-            self._save_tree(node.get_right(), id_model, point_ids, point_names, node_map, h_node.id)
-
-        return h_node.id
+    def _save_tree(self, Z: np.ndarray, id_model: int, point_ids: list, point_names: list) -> None:
+        """Guarda el árbol de la matriz de linkage con un solo COPY, de la raíz a las hojas."""
+        names, heights, parents, points = linkage_tree_rows(Z, point_ids, point_names)
+        self.hierarchical_repo.add_tree(id_model, names, heights, parents, points)
     
     def _get_parameters(self, configuration_json):
         # Valores por defecto con clave 'method' en lugar de 'linkage'
@@ -10,8 +10,6 @@ from ...task.task_entity import TaskCreateModel
 from ..entities.clustering_cluster_entity import ClusteringCluster
 from ..entities.clustering_metrics_entity import ClusteringMetrics
 from ..entities.index_entity import ModelIndex
-from ..entities.kmeans_centroid_entity import KMeansCentroid
-from ..entities.kmeans_point_entity import KMeansPoint
 from ..repositories.clustering_cluster_repository import \
     ClusteringClusterRepository
 from ..repositories.clustering_metrics_repository import \
@@ -76,25 +74,14 @@ class ClusteringKMeans:
         return model.id
 
     def _save_centroids(self, id_model: int, kmeans: KMeans, feature_ids: List[int], cluster_id_map: dict) -> None:
-        for i, center in enumerate(kmeans.cluster_centers_):
-            cluster_id = cluster_id_map[i]
-            for j, value in enumerate(center):
-                centroid = KMeansCentroid(
-                    id_model=id_model,
-                    id_cluster=cluster_id,
-                    id_feature=feature_ids[j],
-                    value=float(value)
-                )
-                self.kmeans_centroid_repo.add(centroid)
+        # Una fila por cluster y característica, escritas en bloque desde la matriz de centroides
+        cluster_ids = [cluster_id_map[i] for i in range(len(kmeans.cluster_centers_))]
+        self.kmeans_centroid_repo.add_centroids(id_model, cluster_ids, feature_ids, kmeans.cluster_centers_)
 
     def _save_point_assignments(self, id_model: int, labels: np.ndarray, point_ids: List[int], cluster_id_map: dict) -> None:
-        for point_id, cluster_number in zip(point_ids, labels):
-            point = KMeansPoint(
-                id_model=id_model,
-                id_point=point_id,
-                id_cluster=cluster_id_map[int(cluster_number)] 
-            )
-            self.kmeans_point_repo.add(point)
+        # Id del cluster de cada punto a partir de su etiqueta, sin recorrer los puntos
+        cluster_ids = np.array([cluster_id_map[i] for i in range(len(cluster_id_map))], dtype=np.int64)[labels]
+        self.kmeans_point_repo.add_assignments(id_model, point_ids, cluster_ids)
             
     def _save_clusters(self, id_model: int, kmeans: KMeans, points: np.ndarray) -> Tuple[float, float, dict]:
         total_inertia = 0.0
@@ -102,27 +89,31 @@ class ClusteringKMeans:
         labels = kmeans.labels_
         sample_silhouette = silhouette_samples(points, labels)
         
-        cluster_id_map = {}  # Para mapear number -> id real en DB
-
-        for i in range(kmeans.n_clusters):
-            cluster_mask = labels == i
-            cluster_points = points[cluster_mask]
-            center = kmeans.cluster_centers_[i]
-
-            inertia_i = np.sum(np.linalg.norm(cluster_points - center, axis=1) ** 2)
-            silhouette_i = float(np.mean(sample_silhouette[cluster_mask])) if len(cluster_points) >= 2 else 0.0
-
-            cluster = ClusteringCluster(
-                id_model=id_model,
-                number=i,
-                inertia=inertia_i,
-                silhouette_coefficient=silhouette_i
-            )
-            self.clustering_cluster_repo.add(cluster)
-            cluster_id_map[i] = cluster.id 
-
-            total_inertia += inertia_i
-            total_silhouette += silhouette_i
+        clusters = []
+
+        # Los clusters se escriben juntos al cerrar el lote, que les asigna su id
+        with self.clustering_cluster_repo.batch():
+            for i in range(kmeans.n_clusters):
+                cluster_mask = labels == i
+                cluster_points = points[cluster_mask]
+                center = kmeans.cluster_centers_[i]
+
+                inertia_i = np.sum(np.linalg.norm(cluster_points - center, axis=1) ** 2)
+                silhouette_i = float(np.mean(sample_silhouette[cluster_mask])) if len(cluster_points) >= 2 else 0.0
+
+                cluster = ClusteringCluster(
+                    id_model=id_model,
+                    number=i,
+                    inertia=inertia_i,
+                    silhouette_coefficient=silhouette_i
+                )
+                self.clustering_cluster_repo.add(cluster)
+                clusters.append(cluster)
+
+                total_inertia += inertia_i
+                total_silhouette += silhouette_i
+
+        cluster_id_map = {cluster.number: cluster.id for cluster in clusters}  # Para mapear number -> id real en DB
 
         return total_inertia, total_silhouette, cluster_id_map
 
@@ -10,7 +10,6 @@ from ...task.task_entity import TaskCreateModel
 from ..entities.clustering_cluster_entity import ClusteringCluster
 from ..entities.clustering_metrics_entity import ClusteringMetrics
 from ..entities.index_entity import ModelIndex
-from ..entities.kmedoids_point_entity import KMedoidsPoint
 from ..repositories.clustering_cluster_repository import \
     ClusteringClusterRepository
 from ..repositories.clustering_metrics_repository import \
@@ -60,43 +59,42 @@ class ClusteringKMedoids:
         return model.id
 
     def _save_point_assignments(self, id_model: int, labels: np.ndarray, point_ids: List[int], cluster_id_map: dict, medoid_indices: np.ndarray) -> None:
-        medoid_point_ids = set([point_ids[i] for i in medoid_indices])
-        for point_id, cluster_number in zip(point_ids, labels):
-            is_medoid = point_id in medoid_point_ids
-            point = KMedoidsPoint(
-                id_model=id_model,
-                id_point=point_id,
-                id_cluster=cluster_id_map[int(cluster_number)],
-                is_medoid=is_medoid
-            )
-            self.kmedoids_point_repo.add(point)
+        # Id del cluster de cada punto a partir de su etiqueta y marca de medoide, sin recorrer los puntos
+        cluster_ids = np.array([cluster_id_map[i] for i in range(len(cluster_id_map))], dtype=np.int64)[labels]
+        is_medoid = np.zeros(len(point_ids), dtype=bool)
+        is_medoid[medoid_indices] = True
+        self.kmedoids_point_repo.add_assignments(id_model, point_ids, cluster_ids, is_medoid)
 
     def _save_clusters(self, id_model: int, kmedoids: KMedoids, points: np.ndarray) -> Tuple[float, float, dict]:
         labels = kmedoids.labels_
         sample_silhouette = silhouette_samples(points, labels)
         total_dispersion = 0.0
         total_silhouette = 0.0
-        cluster_id_map = {}
-
-        for i in range(kmedoids.n_clusters):
-            cluster_mask = labels == i
-            cluster_points = points[cluster_mask]
-            medoid = points[kmedoids.medoid_indices_[i]]
-
-            dispersion_i = np.sum(np.linalg.norm(cluster_points - medoid, axis=1))
-            silhouette_i = float(np.mean(sample_silhouette[cluster_mask])) if len(cluster_points) >= 2 else 0.0
-
-            cluster = ClusteringCluster(
-                id_model=id_model,
-                number=i,
-                inertia=dispersion_i,
-                silhouette_coefficient=silhouette_i
-            )
-            self.clustering_cluster_repo.add(cluster)
-            cluster_id_map[i] = cluster.id
-
-            total_dispersion += dispersion_i
-            total_silhouette += silhouette_i
+        clusters = []
+
+        # Los clusters se escriben juntos al cerrar el lote, que les asigna su id
+        with self.clustering_cluster_repo.batch():
+            for i in range(kmedoids.n_clusters):
+                cluster_mask = labels == i
+                cluster_points = points[cluster_mask]
+                medoid = points[kmedoids.medoid_indices_[i]]
+
+                dispersion_i = np.sum(np.linalg.norm(cluster_points - medoid, axis=1))
+                silhouette_i = float(np.mean(sample_silhouette[cluster_mask])) if len(cluster_points) >= 2 else 0.0
+
+                cluster = ClusteringCluster(
+                    id_model=id_model,
+                    number=i,
+                    inertia=dispersion_i,
+                    silhouette_coefficient=silhouette_i
+                )
+                self.clustering_cluster_repo.add(cluster)
+                clusters.append(cluster)
+
+                total_dispersion += dispersion_i
+                total_silhouette += silhouette_i
+
+        cluster_id_map = {cluster.number: cluster.id for cluster in clusters}
 
         return total_dispersion, total_silhouette, cluster_id_map
 
@@ -28,16 +28,17 @@ class CorrelationPearson:
 
         # Calcular correlación para cada par de características
         n = len(feature_ids)
-        for i in range(n):
-            for j in range(i + 1, n):
-                coef, _ = stats.pearsonr(points[:, i], points[:, j])
-                correlation = Correlation(
-                    id_model=id_model,
-                    id_feature1=feature_ids[i],
-                    id_feature2=feature_ids[j],
-                    value=float(coef),
-                )
-                self.correlation_repo.add(correlation)
+        with self.correlation_repo.batch():
+            for i in range(n):
+                for j in range(i + 1, n):
+                    coef, _ = stats.pearsonr(points[:, i], points[:, j])
+                    correlation = Correlation(
+                        id_model=id_model,
+                        id_feature1=feature_ids[i],
+                        id_feature2=feature_ids[j],
+                        value=float(coef),
+                    )
+                    self.correlation_repo.add(correlation)
                 
         return id_model        
 
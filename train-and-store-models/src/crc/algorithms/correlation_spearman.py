@@ -31,16 +31,17 @@ class CorrelationSpearman:
 
         # Guardar valores de correlación para cada par (solo parte triangular superior sin la diagonal)
         n = len(feature_ids)
-        for i in range(n):
-            for j in range(i + 1, n):
-                corr_value = float(coef_matrix[i, j])
-                correlation = Correlation(
-                    id_model=id_model,
-                    id_feature1=feature_ids[i],
-                    id_feature2=feature_ids[j],
-                    value=corr_value
-                )
-                self.correlation_repo.add(correlation)
+        with self.correlation_repo.batch():
+            for i in range(n):
+                for j in range(i + 1, n):
+                    corr_value = float(coef_matrix[i, j])
+                    correlation = Correlation(
+                        id_model=id_model,
+                        id_feature1=feature_ids[i],
+                        id_feature2=feature_ids[j],
+                        value=corr_value
+                    )
+                    self.correlation_repo.add(correlation)
                 
         return id_model        
 
@@ -0,0 +1,31 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def linkage_tree_rows(Z: np.ndarray, point_ids: Sequence, point_names: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray, list]:
+    """
+    Nodos del árbol de la matriz de linkage `Z`, sin recorrerlo recursivamente. Con n puntos, los nodos
+    0..n-1 son las hojas y la fila k de Z crea el nodo n + k, que une los nodos Z[k, 0] y Z[k, 1] a la
+    altura Z[k, 2]. La raíz es el nodo 2n - 2.
+    Devuelve (nombres, alturas, padres, puntos) de la raíz a las hojas, de modo que cada padre precede
+    a sus hijos: `padres[i]` es la fila del padre del nodo i (-1 en la raíz) y `puntos[i]` el punto de
+    una hoja (None en los nodos internos).
+    """
+    n = len(point_ids)
+    total = 2 * n - 1
+
+    # Padre de cada nodo (-1 en la raíz)
+    parent = np.full(total, -1, dtype=np.int64)
+    children = Z[:, :2].astype(np.int64)
+    parent[children[:, 0]] = np.arange(n, total)
+    parent[children[:, 1]] = np.arange(n, total)
+
+    height = np.concatenate([np.zeros(n), Z[:, 2]])
+    names = list(point_names) + [f"node_{i}" for i in range(n, total)]
+    points = list(point_ids) + [None] * (n - 1)
+
+    # El nodo i pasa a la fila total - 1 - i
+    order = np.arange(total - 1, -1, -1)
+    parent_rows = np.where(parent[order] >= 0, total - 1 - parent[order], -1)
+    return [names[i] for i in order], height[order], parent_rows, [points[i] for i in order]
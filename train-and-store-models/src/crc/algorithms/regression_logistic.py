@@ -36,28 +36,29 @@ class RegressionLogistic:
         z_values = model.tvalues  # z en lugar de t
         p_values = model.pvalues
 
-        # Guardar el intercepto (id_feature = None)
-        intercept = Regression(
-            id_model=id_model,
-            id_feature=None,
-            coeff=float(coeffs[0]),
-            std_err=float(std_errs[0]),
-            value=float(z_values[0]),
-            p_value=float(p_values[0])
-        )
-        self.regression_repo.add(intercept)
-
-        # Guardar los coeficientes asociados a las variables predictoras
-        for i, id_feature in enumerate(feature_ids):
-            regression = Regression(
+        with self.regression_repo.batch():
+            # Guardar el intercepto (id_feature = None)
+            intercept = Regression(
                 id_model=id_model,
-                id_feature=id_feature,
-                coeff=float(coeffs[i + 1]),
-                std_err=float(std_errs[i + 1]),
-                value=float(z_values[i + 1]),
-                p_value=float(p_values[i + 1])
+                id_feature=None,
+                coeff=float(coeffs[0]),
+                std_err=float(std_errs[0]),
+                value=float(z_values[0]),
+                p_value=float(p_values[0])
             )
-            self.regression_repo.add(regression)
+            self.regression_repo.add(intercept)
+
+            # Guardar los coeficientes asociados a las variables predictoras
+            for i, id_feature in enumerate(feature_ids):
+                regression = Regression(
+                    id_model=id_model,
+                    id_feature=id_feature,
+                    coeff=float(coeffs[i + 1]),
+                    std_err=float(std_errs[i + 1]),
+                    value=float(z_values[i + 1]),
+                    p_value=float(p_values[i + 1])
+                )
+                self.regression_repo.add(regression)
             
         return id_model
 
@@ -5,6 +5,10 @@ from .repository import Repository
 
 
 class ClusteringClusterRepository(Repository[ClusteringCluster]):
+    TABLE = "grafana_ml_model_clustering_cluster"
+    COLUMNS = ("id_model", "number", "inertia", "silhouette_coefficient")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +29,8 @@ class ClusteringClusterRepository(Repository[ClusteringCluster]):
             return [ClusteringCluster(*row) for row in cursor.fetchall()]
 
     def add(self, item: ClusteringCluster) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_clustering_cluster (id_model, number, inertia, silhouette_coefficient) VALUES (%s, %s, %s, %s) RETURNING id",
@@ -1,10 +1,17 @@
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
 
 from ..entities.clustering_hierarchical_entity import ClusteringHierarchicalE
 from .repository import Repository
 
 
 class ClusteringHierarchicalRepository(Repository[ClusteringHierarchicalE]):
+    TABLE = "grafana_ml_model_clustering_hierarchical"
+    COLUMNS = ("id_model", "name", "height", "id_parent", "id_point")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +32,8 @@ class ClusteringHierarchicalRepository(Repository[ClusteringHierarchicalE]):
             return [ClusteringHierarchicalE(*row) for row in cursor.fetchall()]
 
     def add(self, item: ClusteringHierarchicalE) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_clustering_hierarchical (id_model, name, height, id_parent, id_point) VALUES (%s, %s, %s, %s, %s) RETURNING id",
@@ -32,6 +41,30 @@ class ClusteringHierarchicalRepository(Repository[ClusteringHierarchicalE]):
             )
             item.id = cursor.fetchone()[0]
 
+    def add_tree(self, id_model: int, names: Sequence[str], heights: np.ndarray, parents: np.ndarray,
+                 point_ids: Sequence) -> np.ndarray:
+        """
+        Guarda un árbol completo con un solo COPY y devuelve los ids de sus nodos. `parents[i]` es la
+        posición del padre del nodo i en los mismos arrays (-1 en la raíz) y `point_ids[i]` el punto
+        de una hoja (None en los nodos internos). Los ids se reservan antes de escribir, así que cada
+        nodo se inserta ya enlazado con su padre.
+        """
+        parents = np.asarray(parents, dtype=np.int64)
+        with self.connect() as cursor:
+            ids = np.array(self.reserve_ids(cursor, self.TABLE, self.ID_COLUMN, len(parents)), dtype=np.int64)
+            id_parent = pd.Series(ids[np.maximum(parents, 0)], dtype="Int64")
+            id_parent[parents < 0] = pd.NA
+            frame = pd.DataFrame({
+                "id_model": id_model,
+                "id": ids,
+                "id_parent": id_parent,
+                "id_point": pd.array(list(point_ids), dtype="Int64"),
+                "name": pd.Series(names, dtype=object),
+                "height": np.asarray(heights, dtype=np.float64)
+            })
+            self.copy_frame(cursor, self.TABLE, frame, max(len(frame), 1))
+        return ids
+
     def delete(self, id: int) -> None:
         with self.connect() as cursor:
             cursor.execute("DELETE FROM grafana_ml_model_clustering_hierarchical WHERE id = %s", (id,))
@@ -5,6 +5,10 @@ from .repository import Repository
 
 
 class ClusteringMetricsRepository(Repository[ClusteringMetrics]):
+    TABLE = "grafana_ml_model_clustering_metrics"
+    COLUMNS = ("id_model", "inertia", "silhouette_coefficient", "davies_bouldin_index")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +29,8 @@ class ClusteringMetricsRepository(Repository[ClusteringMetrics]):
             return [ClusteringMetrics(*row) for row in cursor.fetchall()]
 
     def add(self, item: ClusteringMetrics) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_clustering_metrics (id_model, inertia, silhouette_coefficient, davies_bouldin_index) VALUES (%s, %s, %s, %s) RETURNING id",
@@ -5,6 +5,10 @@ from .repository import Repository
 
 
 class CorrelationRepository(Repository[Correlation]):
+    TABLE = "grafana_ml_model_correlation"
+    COLUMNS = ("id_model", "id_feature1", "id_feature2", "value")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +29,8 @@ class CorrelationRepository(Repository[Correlation]):
             return [Correlation(*row) for row in cursor.fetchall()]
 
     def add(self, item: Correlation) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_correlation (id_model, id_feature1, id_feature2, value) VALUES (%s, %s, %s, %s) RETURNING id",
@@ -1,10 +1,17 @@
 from typing import List
 
+import numpy as np
+import pandas as pd
+
+from ...utils.utils import Utils
 from ..entities.kmeans_centroid_entity import KMeansCentroid
 from .repository import Repository
 
 
 class KMeansCentroidRepository(Repository[KMeansCentroid]):
+    TABLE = "grafana_ml_model_kmeans_centroid"
+    COLUMNS = ("id_model", "id_cluster", "id_feature", "value")
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,12 +32,31 @@ class KMeansCentroidRepository(Repository[KMeansCentroid]):
             return [KMeansCentroid(*row) for row in cursor.fetchall()]
 
     def add(self, item: KMeansCentroid) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_kmeans_centroid (id_model, id_cluster, id_feature, value) VALUES (%s, %s, %s, %s)",
                 (item.id_model, item.id_cluster, item.id_feature, item.value)
             )
 
+    def add_centroids(self, id_model: int, cluster_ids: np.ndarray, feature_ids: np.ndarray,
+                      centers: np.ndarray) -> int:
+        """
+        Guarda con COPY la matriz de centroides (`centers[i, j]` es el valor de la característica
+        `feature_ids[j]` en el cluster `cluster_ids[i]`), una fila por cluster y característica.
+        Confirma una sola vez, al terminar.
+        """
+        centers = np.asarray(centers, dtype=np.float64)
+        frame = pd.DataFrame({
+            "id_model": id_model,
+            "id_cluster": np.repeat(np.asarray(cluster_ids, dtype=np.int64), centers.shape[1]),
+            "id_feature": np.tile(np.asarray(feature_ids, dtype=np.int64), centers.shape[0]),
+            "value": centers.ravel()
+        })
+        with self.connect() as cursor:
+            return self.copy_frame(cursor, self.TABLE, frame, Utils.get_write_batch_size())
+
     def delete(self, id: int) -> None:
         with self.connect() as cursor:
             cursor.execute("DELETE FROM grafana_ml_model_kmeans_centroid WHERE id = %s", (id,))
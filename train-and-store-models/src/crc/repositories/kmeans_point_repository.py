@@ -1,10 +1,18 @@
 from typing import List
 
+import numpy as np
+import pandas as pd
+
+from ...utils.utils import Utils
 from ..entities.kmeans_point_entity import KMeansPoint
 from .repository import Repository
 
 
 class KMeansPointRepository(Repository[KMeansPoint]):
+    TABLE = "grafana_ml_model_kmeans_point"
+    COLUMNS = ("id_model", "id_point", "id_cluster")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +33,8 @@ class KMeansPointRepository(Repository[KMeansPoint]):
             return [KMeansPoint(*row) for row in cursor.fetchall()]
 
     def add(self, item: KMeansPoint) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_kmeans_point (id_model, id_point, id_cluster) VALUES (%s, %s, %s) RETURNING id",
@@ -32,6 +42,20 @@ class KMeansPointRepository(Repository[KMeansPoint]):
             )
             item.id = cursor.fetchone()[0]
 
+    def add_assignments(self, id_model: int, point_ids: np.ndarray, cluster_ids: np.ndarray) -> int:
+        """
+        Guarda con COPY el cluster asignado a cada punto (`cluster_ids[i]` es el id del
+        cluster del punto `point_ids[i]`), sin crear un KMeansPoint por punto.
+        Confirma una sola vez, al terminar.
+        """
+        frame = pd.DataFrame({
+            "id_model": id_model,
+            "id_point": np.asarray(point_ids, dtype=np.int64),
+            "id_cluster": np.asarray(cluster_ids, dtype=np.int64)
+        })
+        with self.connect() as cursor:
+            return self.copy_frame(cursor, self.TABLE, frame, Utils.get_write_batch_size())
+
     def delete(self, id: int) -> None:
         with self.connect() as cursor:
             cursor.execute("DELETE FROM grafana_ml_model_kmeans_point WHERE id = %s", (id,))
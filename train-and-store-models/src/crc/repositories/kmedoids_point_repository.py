@@ -1,10 +1,18 @@
 from typing import List
 
+import numpy as np
+import pandas as pd
+
+from ...utils.utils import Utils
 from ..entities.kmedoids_point_entity import KMedoidsPoint
 from .repository import Repository
 
 
 class KMedoidsPointRepository(Repository[KMedoidsPoint]):
+    TABLE = "grafana_ml_model_kmedoids_point"
+    COLUMNS = ("id_model", "id_point", "id_cluster", "is_medoid")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +33,8 @@ class KMedoidsPointRepository(Repository[KMedoidsPoint]):
             return [KMedoidsPoint(*row) for row in cursor.fetchall()]
 
     def add(self, item: KMedoidsPoint) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_kmedoids_point (id_model, id_point, id_cluster, is_medoid) VALUES (%s, %s, %s, %s) RETURNING id",
@@ -32,6 +42,22 @@ class KMedoidsPointRepository(Repository[KMedoidsPoint]):
             )
             item.id = cursor.fetchone()[0]
 
+    def add_assignments(self, id_model: int, point_ids: np.ndarray, cluster_ids: np.ndarray,
+                        is_medoid: np.ndarray) -> int:
+        """
+        Guarda con COPY el cluster asignado a cada punto y si es el medoide de su cluster,
+        sin crear un KMedoidsPoint por punto.
+        Confirma una sola vez, al terminar.
+        """
+        frame = pd.DataFrame({
+            "id_model": id_model,
+            "id_point": np.asarray(point_ids, dtype=np.int64),
+            "id_cluster": np.asarray(cluster_ids, dtype=np.int64),
+            "is_medoid": np.asarray(is_medoid, dtype=bool)
+        })
+        with self.connect() as cursor:
+            return self.copy_frame(cursor, self.TABLE, frame, Utils.get_write_batch_size())
+
     def delete(self, id: int) -> None:
         with self.connect() as cursor:
             cursor.execute("DELETE FROM grafana_ml_model_kmedoids_point WHERE id = %s", (id,))
@@ -5,6 +5,10 @@ from .repository import Repository
 
 
 class ModelIndexRepository(Repository[ModelIndex]):
+    TABLE = "grafana_ml_model_index"
+    COLUMNS = ("id_source", "algorithm", "parameters")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -26,6 +30,8 @@ class ModelIndexRepository(Repository[ModelIndex]):
 
     def add(self, item: ModelIndex) -> None:
         """Agrega un nuevo ModelIndex y actualiza su id."""
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_index (id_source, algorithm, parameters) VALUES (%s, %s, %s) RETURNING id",
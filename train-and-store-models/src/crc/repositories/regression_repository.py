@@ -5,6 +5,10 @@ from .repository import Repository
 
 
 class RegressionRepository(Repository[Regression]):
+    TABLE = "grafana_ml_model_regression"
+    COLUMNS = ("id_model", "id_feature", "coeff", "std_err", "value", "p_value")
+    ID_COLUMN = "id"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -25,6 +29,8 @@ class RegressionRepository(Repository[Regression]):
             return [Regression(*row) for row in cursor.fetchall()]
 
     def add(self, item: Regression) -> None:
+        if self._enqueue(item):
+            return
         with self.connect() as cursor:
             cursor.execute(
                 "INSERT INTO grafana_ml_model_regression (id_model, id_feature, coeff, std_err, value, p_value) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
@@ -1,15 +1,32 @@
 import contextlib
+import csv
+import io
+import json
 from abc import ABC, abstractmethod
-from typing import Generic, List, TypeVar
+from typing import Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+from psycopg2.sql import SQL, Composable, Identifier
 
 from ...database.database_connection import DatabaseConnection
+from ...utils.utils import Utils
 
 T = TypeVar('T')
 
 class Repository(ABC, Generic[T]):
+    # Tabla y columnas (atributos de la entidad con el mismo nombre) de las escrituras en bloque.
+    # Si la tabla tiene un id SERIAL (ID_COLUMN), se reserva de su secuencia y se asigna a la entidad
+    TABLE: Optional[str] = None
+    COLUMNS: Tuple[str, ...] = ()
+    ID_COLUMN: Optional[str] = None
+
     def __init__(self):
         # Crear una instancia de la conexión a la base de datos
         self.db = DatabaseConnection()
+        # Entidades pendientes de escribir mientras hay un lote abierto (ver batch)
+        self._pending: Optional[List[T]] = None
+        self._pending_size = 0
     
     @contextlib.contextmanager
     def connect(self, autocommit=True):
@@ -22,6 +39,186 @@ class Repository(ABC, Generic[T]):
         finally:
             cursor.close()
             
+    def add_many(self, items: Iterable[T], batch_size: Optional[int] = None) -> int:
+        """
+        Inserta las entidades en bloque con COPY, en lotes de `batch_size` filas ([models] write_batch_size
+        por defecto), y confirma al terminar. Devuelve el número de filas insertadas.
+        """
+        if self.TABLE is None:
+            raise NotImplementedError(f"{type(self).__name__} no admite escrituras en bloque.")
+        items = list(items)
+        if not items:
+            return 0
+
+        columns = list(self.COLUMNS)
+        with self.connect() as cursor:
+            if self.ID_COLUMN:
+                for item, id in zip(items, self.reserve_ids(cursor, self.TABLE, self.ID_COLUMN, len(items))):
+                    setattr(item, self.ID_COLUMN, id)
+                columns.append(self.ID_COLUMN)
+            return self.copy_rows(
+                cursor, self.TABLE, columns,
+                ([getattr(item, c) for c in columns] for item in items),
+                batch_size or Utils.get_write_batch_size()
+            )
+
+    @contextlib.contextmanager
+    def batch(self, batch_size: Optional[int] = None):
+        """
+        Mientras el contexto está abierto, add() acumula las entidades en lugar de insertarlas una a una:
+        se escriben con add_many cada `batch_size` entidades y al salir. Los ids se asignan al escribir
+        cada lote. Si el bloque termina con una excepción, las entidades pendientes se descartan.
+        """
+        if self._pending is not None:
+            # Lote anidado: se sigue acumulando en el exterior
+            yield self
+            return
+
+        self._pending = []
+        self._pending_size = batch_size or Utils.get_write_batch_size()
+        try:
+            yield self
+            items, self._pending = self._pending, None
+            self.add_many(items, self._pending_size)
+        finally:
+            self._pending = None
+
+    def _enqueue(self, item: T) -> bool:
+        """Acumula `item` si hay un lote abierto. Devuelve False si no lo hay y debe insertarse ya."""
+        if self._pending is None:
+            return False
+        self._pending.append(item)
+        if len(self._pending) >= self._pending_size:
+            items, self._pending = self._pending, []
+            self.add_many(items, self._pending_size)
+        return True
+
+    def copy_rows(self, cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence], batch_size: int = 100000) -> int:
+        """
+        Carga filas en bloque mediante COPY FROM STDIN (formato texto).
+        Las filas se envían en lotes de `batch_size` para acotar el tamaño del buffer.
+        Devuelve el número de filas cargadas.
+        """
+        query = SQL("COPY {} ({}) FROM STDIN").format(
+            Identifier(table),
+            SQL(', ').join(Identifier(c) for c in columns)
+        ).as_string(cursor)
+
+        buffer = io.StringIO()
+        total = 0
+        pending = 0
+        for row in rows:
+            buffer.write('\t'.join(self._copy_value(v) for v in row))
+            buffer.write('\n')
+            pending += 1
+            if pending >= batch_size:
+                total += self._flush_copy(cursor, query, buffer)
+                buffer = io.StringIO()
+                pending = 0
+
+        if pending:
+            total += self._flush_copy(cursor, query, buffer)
+        return total
+
+    def copy_frame(self, cursor, table: str, frame: pd.DataFrame, batch_size: int = 100000) -> int:
+        """
+        Carga un DataFrame mediante COPY FROM STDIN sin recorrerlo fila a fila:
+        los nombres de columna del DataFrame deben coincidir con los de la tabla.
+        Los nulos (None/NaN) se envían como \\N y los textos se escapan de forma vectorizada.
+        """
+        query = SQL("COPY {} ({}) FROM STDIN").format(
+            Identifier(table),
+            SQL(', ').join(Identifier(c) for c in frame.columns)
+        ).as_string(cursor)
+
+        text_columns = frame.select_dtypes(include=['object', 'string']).columns
+        total = 0
+        for start in range(0, len(frame), batch_size):
+            block = frame.iloc[start:start + batch_size]
+            if len(text_columns):
+                block = block.copy()
+                for column in text_columns:
+                    block[column] = (block[column].str.replace('\\', '\\\\', regex=False)
+                                                  .str.replace('\t', '\\t', regex=False)
+                                                  .str.replace('\n', '\\n', regex=False)
+                                                  .str.replace('\r', '\\r', regex=False))
+
+            buffer = io.StringIO()
+            block.to_csv(buffer, sep='\t', header=False, index=False, na_rep='\\N',
+                         quoting=csv.QUOTE_NONE, lineterminator='\n')
+            total += self._flush_copy(cursor, query, buffer)
+        return total
+
+    @staticmethod
+    def reserve_ids(cursor, table: str, column: str, count: int) -> List[int]:
+        """
+        Reserva `count` identificadores de la secuencia SERIAL de `table.column` en una sola consulta.
+        Los ids se devuelven en orden creciente, listos para asignarse a las filas antes de insertarlas.
+        Es estático para que lo usen también los repositorios que no heredan de Repository (da).
+        """
+        if count <= 0:
+            return []
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s) ORDER BY 1",
+            (table, column, count)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def copy_out_matrix(self, cursor, select: Composable, width: int,
+                        dtype: np.dtype = np.float64, rows: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lee el resultado de `select` con COPY ... TO STDOUT en formato binario y lo decodifica
+        con NumPy sin crear objetos Python por fila. `select` debe devolver un entero (id) seguido
+        de `width` columnas double precision sin nulos. Devuelve (ids, matriz de filas x width)
+        con el tipo `dtype` (p. ej. float32 para reducir la memoria).
+        Si se conoce el número de filas (`rows`), la matriz se reserva una sola vez y se rellena
+        por bloques según llegan los datos, de modo que la memoria adicional no depende del tamaño.
+        """
+        query = SQL("COPY ({}) TO STDOUT (FORMAT binary)").format(select).as_string(cursor)
+        reader = _MatrixReader(width, rows, dtype)
+        cursor.copy_expert(query, reader)
+        return reader.finish()
+
+    def copy_out_text(self, cursor, select: Composable) -> np.ndarray:
+        """
+        Lee la única columna de texto de `select` con COPY ... TO STDOUT (CSV) como array de cadenas,
+        con una cadena vacía por cada NULL. Todos los valores van entre comillas: en CSV un NULL sería
+        una línea en blanco, que el lector descartaría desalineando el array con las filas.
+        """
+        query = SQL("""
+            COPY (SELECT COALESCE(s.value::text, '') FROM ({}) AS s(value)) TO STDOUT (FORMAT csv, FORCE_QUOTE *)
+        """).format(select).as_string(cursor)
+        buffer = io.StringIO()
+        cursor.copy_expert(query, buffer)
+        if not buffer.tell():
+            return np.array([], dtype=str)
+        buffer.seek(0)
+        column = pd.read_csv(buffer, header=None, dtype=str, keep_default_na=False, na_filter=False)[0]
+        return column.to_numpy(dtype=str)
+
+    @staticmethod
+    def _flush_copy(cursor, query: str, buffer: io.StringIO) -> int:
+        buffer.seek(0)
+        cursor.copy_expert(query, buffer)
+        return cursor.rowcount
+
+    @staticmethod
+    def _copy_value(value) -> str:
+        """Convierte un valor a su representación en el formato texto de COPY."""
+        if value is None:
+            return '\\N'
+        if isinstance(value, (bool, np.bool_)):
+            return 't' if value else 'f'
+        if isinstance(value, (dict, list)):
+            # Columnas json/jsonb: str() daría la representación de Python (comillas simples, None, True)
+            value = json.dumps(value)
+        if isinstance(value, str):
+            return (value.replace('\\', '\\\\')
+                         .replace('\t', '\\t')
+                         .replace('\n', '\\n')
+                         .replace('\r', '\\r'))
+        return str(value)
+
     @abstractmethod
     def get(self, id: int) -> T:
         raise NotImplementedError
@@ -36,4 +233,91 @@ class Repository(ABC, Generic[T]):
 
     @abstractmethod
     def delete(self, id: int) -> None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+
+class _MatrixReader:
+    """
+    Destino de COPY ... TO STDOUT (formato binario) que decodifica las filas en bloques
+    sobre una matriz ya reservada. Todas las filas miden lo mismo: un int16 con el número de
+    campos y, por campo, un int32 con su longitud seguido del valor (int4 el id, float8 el resto).
+    """
+
+    # Bytes acumulados antes de decodificar un bloque (psycopg2 entrega los datos fila a fila)
+    BLOCK_SIZE = 1 << 20
+    # Firma de la cabecera y marcador de fin del formato binario
+    SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+    TRAILER = b"\xff\xff"
+
+    def __init__(self, width: int, rows: int, dtype: np.dtype):
+        self.width = width
+        self.row_dtype = np.dtype(
+            [('count', '>i2'), ('id_length', '>i4'), ('id', '>i4')]
+            + [field for i in range(width) for field in ((f'length_{i}', '>i4'), (f'value_{i}', '>f8'))]
+        )
+        self.ids = np.empty(rows, dtype=np.int64)
+        self.matrix = np.empty((rows, width), dtype=dtype)
+        self.count = 0
+        self.pending = bytearray()
+        self.header = False
+
+    def write(self, data) -> None:
+        self.pending += data
+        if len(self.pending) >= self.BLOCK_SIZE:
+            self._decode()
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Decodifica lo pendiente (al final solo queda el marcador de fin) y recorta las filas sobrantes."""
+        self._decode()
+        if not self.header or bytes(self.pending) != self.TRAILER:
+            raise ValueError("La salida de COPY está incompleta o no tiene el formato de filas esperado.")
+        return self.ids[:self.count], self.matrix[:self.count]
+
+    def _decode(self) -> None:
+        if not self.header:
+            # Cabecera: firma de 11 bytes, flags (int32) y longitud de la extensión (int32)
+            if len(self.pending) < 19:
+                return
+            if bytes(self.pending[:11]) != self.SIGNATURE:
+                raise ValueError("La salida de COPY no está en formato binario.")
+            size = 19 + int.from_bytes(self.pending[15:19], 'big')
+            if len(self.pending) < size:
+                return
+            del self.pending[:size]
+            self.header = True
+
+        rows = len(self.pending) // self.row_dtype.itemsize
+        if not rows:
+            return
+        if self.count + rows > len(self.ids):
+            self._grow(self.count + rows)
+
+        records = np.frombuffer(self.pending, dtype=self.row_dtype, count=rows)
+        # El formato fijo solo vale si cada fila tiene el id int4 y `width` valores float8 sin nulos:
+        # cualquier otra fila desplazaría todas las siguientes
+        valid = (records['count'] == self.width + 1) & (records['id_length'] == 4)
+        for i in range(self.width):
+            valid &= records[f'length_{i}'] == 8
+        if not valid.all():
+            del records
+            raise ValueError(
+                f"Fila inesperada en la salida de COPY: se esperaba un id int4 y {self.width} valores "
+                "double precision sin nulos."
+            )
+        block = slice(self.count, self.count + rows)
+        self.ids[block] = records['id']
+        for i in range(self.width):
+            self.matrix[block, i] = records[f'value_{i}']
+        # Liberar la vista antes de recortar el buffer
+        del records
+        del self.pending[:rows * self.row_dtype.itemsize]
+        self.count += rows
+
+    def _grow(self, rows: int) -> None:
+        """Amplía la reserva si llegan más filas de las previstas (p. ej. la fuente creció entre consultas)."""
+        capacity = max(rows, 2 * len(self.ids))
+        ids = np.empty(capacity, dtype=self.ids.dtype)
+        matrix = np.empty((capacity, self.width), dtype=self.matrix.dtype)
+        ids[:self.count] = self.ids[:self.count]
+        matrix[:self.count] = self.matrix[:self.count]
+        self.ids, self.matrix = ids, matrix
@@ -2,7 +2,7 @@ from typing import List, Tuple
 
 import numpy as np
 
-from ...source.repositories.source_repository import SourceRepository
+from ...source.manager.source_data_access import SourceDataAccess
 
 
 class SourceBuilder:
@@ -15,23 +15,20 @@ class SourceBuilder:
         - Una lista de los IDs de los puntos.
         - Una lista de los IDs de las características.
         """
-        # Crear el repositorio dentro del método
-        source_repository = SourceRepository()
-
-        # Obtener los datos numéricos usando el repositorio
-        data, features = source_repository.get_numeric_data(id_source)
+        # Los modelos de una misma ejecución comparten la vista ya cargada
+        arrays = SourceDataAccess.numeric(id_source)
 
         # Extraer las características numéricas por punto
-        point_features = np.array([row['features'] for row in data]) 
+        point_features = arrays["features"]
         
         # Obtener los IDs de los puntos
-        point_ids = [row['id_point'] for row in data]
+        point_ids = arrays["point_ids"].tolist()
         
         # Obtener los nombres de los puntos
-        point_names = [row['name'] for row in data]
+        point_names = arrays["point_names"].tolist()
 
         # Obtener los IDs de las características
-        feature_ids = [row['id_feature'] for row in features]
+        feature_ids = arrays["feature_ids"].tolist()
 
         return point_features, point_ids, feature_ids, point_names
     
@@ -43,17 +40,10 @@ class SourceBuilder:
         - y: vector objetivo numérico
         - feature_ids: lista de id_feature (sin el target)
         """
-        source_repository = SourceRepository()
-        data, features = source_repository.get_numeric_data_with_target(id_source)
-
-        # Obtener la matriz de características
-        X = np.array([row['features'] for row in data])
-
-        # Obtener la variable objetivo
-        y = np.array([row['target'] for row in data], dtype=float)
+        X, y, feature_ids = SourceBuilder._build_target_data(id_source)
 
-        # Obtener los ids de las características excluyendo el target
-        feature_ids = [f['id_feature'] for f in features]
+        # Obtener la variable objetivo numérica
+        y = y.astype(float)
 
         return X, y, feature_ids
     
@@ -65,14 +55,7 @@ class SourceBuilder:
         - y: vector objetivo binario (0 y 1)
         - feature_ids: lista de id_feature (sin el target)
         """
-        source_repository = SourceRepository()
-        data, features = source_repository.get_numeric_data_with_target(id_source)
-
-        # Obtener las características
-        X = np.array([row['features'] for row in data])
-
-        # Obtener el target (que está en un campo separado)
-        y = np.array([row['target'] for row in data])
+        X, y, feature_ids = SourceBuilder._build_target_data(id_source)
 
         # Verificar si la variable objetivo es binaria
         unique_values = np.unique(y)
@@ -83,7 +66,13 @@ class SourceBuilder:
         if not np.array_equal(unique_values, [0, 1]):
             y = np.where(y == unique_values[0], 0, 1)
 
-        # Obtener los ids de las características sin incluir el target
-        feature_ids = [f['id_feature'] for f in features]
+        return X, y, feature_ids
 
-        return X, y, feature_ids
\ No newline at end of file
+    @staticmethod
+    def _build_target_data(id_source: int) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+        """
+        Matriz de características sin la variable objetivo, vector objetivo e ids de las
+        características, compartidos por los modelos de una misma ejecución.
+        """
+        arrays = SourceDataAccess.with_target(id_source)
+        return arrays["features"], arrays["target"], arrays["feature_ids"].tolist()
@@ -21,12 +21,12 @@ class AssociationRulesAlgorithm:
             # 2. Crear DataFrame con columnas _1 (presencia) y _0 (ausencia)
             df = pd.DataFrame()
             column_names = [f['name'] for f in features]
-            binary_data = np.array(data)  # Asume que data es una lista de listas o array
+            binary_data = np.asarray(data, dtype=bool)  # Matriz 0/1 como booleanos (1 byte por celda)
 
             ## Columnas _1 (presencia)
             df_1 = pd.DataFrame(binary_data, columns=[f"{name}_1" for name in column_names])
             ## Columnas _0 (ausencia)
-            df_0 = pd.DataFrame(1 - binary_data, columns=[f"{name}_0" for name in column_names])
+            df_0 = pd.DataFrame(~binary_data, columns=[f"{name}_0" for name in column_names])
         
             ## Combinar ambos DataFrames
             df = pd.concat([df_1, df_0], axis=1)
@@ -4,7 +4,6 @@ import numpy as np
 import pandas as pd
 
 from src.da.entities.association_rule_entity import AssociationRule
-from src.da.entities.decision_tree_entity import DecisionTreeNode
 from src.da.entities.index_entity import Index
 from src.da.models.association_rules_model import AssociationRulesModel
 from src.da.models.decision_tree_model import DecisionTreeModel
@@ -17,13 +16,6 @@ class Controller:
         self.modelo_arbol = DecisionTreeModel()
         self.modelo_reglas = AssociationRulesModel()
 
-    def get_parent_id(self, nodo_id, nodos):
-        """Determina el ID del nodo padre de un nodo dado."""
-        for i, nodo in enumerate(nodos):
-            if nodo['left_child'] == nodo_id or nodo['right_child'] == nodo_id:
-                return i  # Devuelve el índice del nodo actual como el padre
-        return None  # Devuelve None si no tiene padre (caso raíz)
-    
     def save_model_tree(self, id_source: int, parameters: Dict) -> int:
         """Guardar el modelo en ModelIndex"""
         model_tree = self.manager_repo.get_index_repository().create(Index(id_source=id_source, algorithm="arbol_decision", parameters=parameters))
@@ -86,55 +78,32 @@ class Controller:
         precision = self.modelo_arbol.get_precision()
         print(f"Precisión del modelo de árbol de decisión: {precision:.2f}")
 
-        # Mapear características y valores de predicción a sus IDs en la base de datos
-        caracteristica_ids = {nombre: self.manager_repo.get_decision_tree_repository().get_feature_id(id_source, nombre) for nombre in feature_names}
-        prediccion_ids = {clase: self.manager_repo.get_decision_tree_repository().get_prediction_value_id(id_source, clase) for clase in class_names}
-
-        # Primera etapa: Inserción inicial de nodos
-        nodo_id_map = {}
-        # Insertar cada nodo del árbol de decisión
-        for nodo_id, nodo in enumerate(nodos):
-           # Obtener el índice de la característica si es un nodo de decisión
-           caracteristica_index = nodo['feature']
-
-           # Asegurarse de que el índice está dentro de los límites
-           caracteristica = feature_names[caracteristica_index] if 0 <= caracteristica_index < len(feature_names) else None
-           caracteristica_id = caracteristica_ids.get(caracteristica) if caracteristica else None
-
-           # Establecer umbral
-           umbral = nodo['threshold'] if caracteristica_id is not None else None
-           es_hoja = nodo['left_child'] == -1 and nodo['right_child'] == -1
-
-           # Obtener el ID del valor de predicción si es hoja
-           valor_prediccion_id = None
-           if es_hoja:
-               valor_prediccion = class_names[valores[nodo_id].argmax()]
-               valor_prediccion_id = prediccion_ids.get(valor_prediccion)
-        
-           # Insertar el nodo en la tabla arbol_decision con IDs de características y predicción
-           nodo_db_id = self.manager_repo.get_decision_tree_repository().create(DecisionTreeNode(id_model= None, parent_node= None, feature= caracteristica_id, 
-                                                                                                 threshold= umbral, left_node= None, right_node= None,
-                                                                                                 is_leaf= es_hoja, prediction_value= valor_prediccion_id))     
-           nodo_id_map[nodo_id] = nodo_db_id
-
-        # Segunda etapa: Actualización de relaciones padre-hijo
-        for nodo_id, nodo in enumerate(nodos):
-           # Obtener el ID del nodo padre
-           nodo_padre_id = nodo_id_map.get(self.get_parent_id(nodo_id, nodos))
-           # Actualizar los indices de los nodos izquierdo y derecho
-           nodo_izquierdo_id = nodo_id_map.get(nodo['left_child']) if nodo['left_child'] != -1 else None
-           nodo_derecho_id = nodo_id_map.get(nodo['right_child']) if nodo['right_child'] != -1 else None
-
-           self.manager_repo.get_decision_tree_repository().update_node_relations(
-               nodo_id_map[nodo_id], nodo_padre_id, nodo_izquierdo_id, nodo_derecho_id
-            )
-        
-        # Tercera etapa: Crear el modelo en Index
-        modelo_id = self.save_model_tree(id_source, parameters)
+        # Mapear características y valores de predicción a sus IDs en la base de datos (una consulta cada uno)
+        repositorio_arbol = self.manager_repo.get_decision_tree_repository()
+        caracteristica_ids = repositorio_arbol.get_feature_ids(id_source)
+        prediccion_ids = repositorio_arbol.get_prediction_value_ids(id_source)
 
-        # Cuarta etapa: Actualizar los nodos para asignarles modelo_id 
-        for nodo_db_id in nodo_id_map.values():
-            self.manager_repo.get_decision_tree_repository().update_id_model(nodo_db_id, modelo_id)
+        # Relaciones entre nodos
+        padres, izquierdos, derechos, es_hoja = DecisionTreeModel.get_relations(nodos)
+
+        # Característica y umbral de los nodos de decisión
+        ids_por_indice = [caracteristica_ids.get(nombre) for nombre in feature_names]
+        caracteristicas = [ids_por_indice[i] if 0 <= i < len(feature_names) else None for i in nodos['feature']]
+        umbrales = [float(u) if c is not None else None for c, u in zip(caracteristicas, nodos['threshold'])]
+
+        # Valor de predicción de las hojas: la clase con más muestras
+        ids_por_clase = [prediccion_ids.get(clase) for clase in class_names]
+        clases = valores.reshape(len(nodos), -1).argmax(axis=1)
+        predicciones = [ids_por_clase[c] if hoja else None for c, hoja in zip(clases, es_hoja)]
+
+        # Crear el modelo en Index y guardar el árbol ya asociado a él
+        modelo_id = self.save_model_tree(id_source, parameters)
+        try:
+            repositorio_arbol.add_tree(modelo_id, caracteristicas, umbrales, padres, izquierdos, derechos,
+                                       es_hoja, predicciones)
+        except Exception:
+            self.manager_repo.get_index_repository().delete(modelo_id)
+            raise
 
         return modelo_id
 
@@ -146,7 +115,8 @@ class Controller:
 
     def train_and_store_rules(self, id_source, datos, min_support= None, min_confidence= None, parameters=None):
         """Entrenar y almacenar solo el modelo de reglas de asociación."""
-        datos_bool = datos.astype(bool)
+        # Los datos ya llegan como booleanos desde el algoritmo: solo se convierten si no lo son
+        datos_bool = datos if (datos.dtypes == bool).all() else datos.astype(bool)
         self.modelo_reglas.train(datos_bool, min_support=min_support, min_confidence=min_confidence)
         reglas = self.modelo_reglas.get_rules()
 
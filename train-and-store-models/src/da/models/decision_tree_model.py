@@ -1,3 +1,4 @@
+import numpy as np
 from sklearn.metrics import accuracy_score
 from sklearn.tree import DecisionTreeClassifier
 
@@ -42,6 +43,21 @@ class DecisionTreeModel:
         else:
             raise Exception("El modelo no está entrenado")
 
+    @staticmethod
+    def get_relations(nodos):
+        """
+        Relaciones entre los nodos a partir de los hijos de cada uno, sin buscar el padre nodo a nodo.
+        Devuelve (padres, izquierdos, derechos, es_hoja): posiciones de nodo, -1 si no hay.
+        """
+        izquierdos = nodos['left_child']
+        derechos = nodos['right_child']
+        es_hoja = (izquierdos == -1) & (derechos == -1)
+        internos = np.flatnonzero(~es_hoja)
+        padres = np.full(len(nodos), -1, dtype=np.int64)
+        padres[izquierdos[internos]] = internos
+        padres[derechos[internos]] = internos
+        return padres, izquierdos, derechos, es_hoja
+
     def get_precision(self):
         """Devuelve la precisión calculada del modelo."""
         if self.precision is not None:
@@ -1,11 +1,14 @@
-from typing import List, Tuple
+from itertools import repeat
+from typing import Dict, List, Sequence, Tuple
 
 import numpy as np
+from psycopg2.extras import execute_values
 
 from src.da.entities.decision_tree_entity import DecisionTreeNode
 from src.da.repositories.base_repository import BaseRepository
 
-from ...exceptions.exceptions import SourceNotFoundException
+from ...crc.repositories.repository import Repository
+from ...source.manager.source_data_access import SourceDataAccess
 
 
 class DecisionTreeRepository(BaseRepository[DecisionTreeNode]):
@@ -98,123 +101,62 @@ class DecisionTreeRepository(BaseRepository[DecisionTreeNode]):
             )
             return [DecisionTreeNode(*row) for row in cursor.fetchall()]
         
-    def update_node_relations(self, id_node: int, parent_node: int, left_node: int, right_node: int) -> None:
-        """Actualizar relaciones de un nodo en la tabla."""
+    def add_tree(self, id_model: int, features: Sequence, thresholds: Sequence, parents: np.ndarray,
+                 lefts: np.ndarray, rights: np.ndarray, is_leaf: np.ndarray, prediction_values: Sequence) -> np.ndarray:
+        """
+        Guarda un árbol completo, ya asociado a su modelo, en una sola sentencia INSERT y devuelve los ids
+        de sus nodos. `parents`, `lefts` y `rights` son posiciones de nodo en los mismos arrays (-1 si no hay).
+        Los ids se reservan antes de la secuencia, así que cada nodo se inserta con sus relaciones resueltas.
+        """
+        total = len(is_leaf)
         with self.connect() as cursor:
-            cursor.execute(
-                """
-                UPDATE grafana_ml_model_decision_tree
-                SET parent_node = %s, left_node = %s, right_node = %s
-                WHERE id_node = %s
-                """,
-                (parent_node, left_node, right_node, id_node)
-            )
+            ids = np.array(Repository.reserve_ids(cursor, "grafana_ml_model_decision_tree", "id_node", total), dtype=np.int64)
 
-    def update_id_model(self, id_node: int, id_model: int) -> None:
-        """Asigna un id_model a un nodo existente del árbol de decisión."""
-        with self.connect() as cursor:
-            cursor.execute(
+            def resolve(positions: np.ndarray) -> List[int]:
+                return [int(ids[p]) if p >= 0 else None for p in np.asarray(positions, dtype=np.int64)]
+
+            rows = list(zip(
+                repeat(id_model), ids.tolist(), resolve(parents), features, thresholds,
+                resolve(lefts), resolve(rights), np.asarray(is_leaf, dtype=bool).tolist(), prediction_values
+            ))
+            execute_values(
+                cursor,
                 """
-                UPDATE grafana_ml_model_decision_tree
-                SET id_model = %s
-                WHERE id_node = %s
+                INSERT INTO grafana_ml_model_decision_tree
+                (id_model, id_node, parent_node, feature, threshold, left_node, right_node, is_leaf, prediction_value)
+                VALUES %s
                 """,
-                (id_model, id_node)
+                rows,
+                page_size=max(total, 1)
             )
+        return ids
 
-    def get_feature_id(self, id_source: int, name: str) -> int:
-        """Devuelve el ID de una característica a partir de su nombre y fuente de datos."""
+    def get_feature_ids(self, id_source: int) -> Dict[str, int]:
+        """Devuelve los IDs de las características de una fuente de datos por su nombre."""
         with self.connect() as cursor:
             cursor.execute(
                 """
-                SELECT id
+                SELECT name, id
                 FROM grafana_ml_model_feature
-                WHERE id_source = %s AND name = %s
+                WHERE id_source = %s
                 """,
-                (id_source, name)
+                (id_source,)
             )
-            result = cursor.fetchone()
-            return result[0] if result else None
+            return dict(cursor.fetchall())
 
-    def get_prediction_value_id(self, id_source: int, class_name: str) -> int:
-        """Devuelve el ID de un valor de predicción a partir de su nombre de clase y fuente de datos."""
+    def get_prediction_value_ids(self, id_source: int) -> Dict[str, int]:
+        """Devuelve los IDs de los valores de predicción de una fuente de datos por su nombre de clase."""
         with self.connect() as cursor:
             cursor.execute(
                 """
-                SELECT id_prediction
+                SELECT class_name, id_prediction
                 FROM grafana_ml_model_prediction_values
-                WHERE id_source = %s AND class_name = %s
+                WHERE id_source = %s
                 """,
-                (id_source, class_name)
+                (id_source,)
             )
-            result = cursor.fetchone()
-            return result[0] if result else None
-    
-    def get_data(self, id_source: int) -> Tuple[np.ndarray, np.ndarray, List[dict], List[dict]]:
-        with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
-                raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-            
-            # Obtener características 
-            cursor.execute("""
-                SELECT id, name, is_target
-                FROM grafana_ml_model_feature
-                WHERE id_source = %s
-                ORDER BY id
-            """, (id_source,))
-        
-            rows = cursor.fetchall()
-            features = []
-            target_id = None
-            for id, name, is_target in rows:
-                if is_target:
-                    target_id = id
-                else:
-                    features.append({'id_feature': id, 'name': name})
-
-            if target_id is None:
-                raise ValueError("No se encontró una variable objetivo.")
-
-            # Determinar el tipo de la variable objetivo
-            cursor.execute("""
-                SELECT DISTINCT numeric_value, string_value
-                FROM grafana_ml_model_point_value
-                WHERE id_source = %s AND id_feature = %s
-            """, (id_source, target_id))
-            
-            values = cursor.fetchall()
-            numeric_values = {v[0] for v in values if v[0] is not None}
-            string_values = {v[1] for v in values if v[1] is not None}
-
-            if not string_values and len(numeric_values) != 2:
-                raise ValueError("La variable objetivo debe ser categórica o numérica binaria.")
-
-            # Obtener datos: características numéricas + objetivo
-            cursor.execute("""
-                SELECT
-                    pv.id_point,
-                    array_agg(pv.numeric_value ORDER BY f.id) FILTER (WHERE NOT f.is_target) AS numeric_features,
-                    MAX(COALESCE(pv.string_value, pv.numeric_value::text)) FILTER (WHERE f.id = %s) AS target_value
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                WHERE pv.id_source = %s
-                GROUP BY pv.id_point
-                ORDER BY pv.id_point
-            """, (target_id, id_source))
-            
-            rows = cursor.fetchall()
-            X = np.array([row[1] for row in rows])
-            y = np.array([row[2] for row in rows])
-
-            # Obtener lista de clases 
-            cursor.execute("""
-                SELECT id_prediction AS id, class_name AS name
-                FROM grafana_ml_model_prediction_values
-                WHERE id_source = %s
-                ORDER BY id_prediction
-            """, (id_source,))
-            class_list = [{'id_prediction': row[0], 'name': row[1]} for row in cursor.fetchall()]
+            return dict(cursor.fetchall())
 
-            return X, y, features, class_list
\ No newline at end of file
+    def get_data(self, id_source: int) -> Tuple[np.ndarray, np.ndarray, List[dict], List[dict]]:
+        """Datos de la fuente, compartidos por los modelos de una misma ejecución."""
+        return SourceDataAccess.classification(id_source)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import configparser
 import logging
 import os
+import re
+import threading
 from pathlib import Path
 
 from psycopg2 import OperationalError, connect
@@ -17,10 +19,31 @@ class DatabaseConnection:
             cls._instance._initialize()
         return cls._instance
 
-    def _initialize(self):
+    @classmethod
+    def for_worker(cls) -> "DatabaseConnection":
+        """
+        Instancia para los procesos de trabajo de la carga en paralelo: el proceso principal ya ha
+        comprobado el esquema y los índices. Además, CREATE INDEX CONCURRENTLY esperaría a la
+        transacción abierta del proceso principal, que a su vez espera a los procesos de trabajo.
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialize(ensure_schema=False)
+        return cls._instance
+
+    def _initialize(self, ensure_schema: bool = True):
         self._config = self._load_config()
-        self._connection = None
-        self._initialize_database()
+        # Cada hilo usa su propia conexión: una conexión de psycopg2 solo admite una transacción a la vez
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        if ensure_schema:
+            self._initialize_database()
+            self._ensure_indexes()
+
+    @property
+    def _connection(self):
+        return getattr(self._local, "connection", None)
 
     @property
     def connection(self):
@@ -58,7 +81,9 @@ class DatabaseConnection:
 
     def _connect(self):
         try:
-            self._connection = connect(**self._config)
+            self._local.connection = connect(**self._config)
+            with self._lock:
+                self._connections.append(self._local.connection)
             logging.info("Conexión a la base de datos establecida")
         except OperationalError as e:
             logging.error(f"Error al conectar a la base de datos: {e}")
@@ -84,10 +109,23 @@ class DatabaseConnection:
                                 "grafana_ml_model_prediction_values", "grafana_ml_model_clustering_cluster", "grafana_ml_model_kmeans_centroid", "grafana_ml_model_kmeans_point",
                                 "grafana_ml_model_kmedoids_point", "grafana_ml_model_clustering_metrics", "grafana_ml_model_clustering_hierarchical", "grafana_ml_model_correlation",
                                 "grafana_ml_model_regression", "grafana_ml_model_decision_tree", "grafana_ml_model_association_rules", "grafana_ml_model_task_create",
-                                "grafana_ml_model_source_create", "grafana_ml_model_task_delete", "grafana_ml_model_source_delete"]  
+                                "grafana_ml_model_source_create", "grafana_ml_model_task_delete", "grafana_ml_model_source_delete",
+                                "grafana_ml_model_source_refresh", "grafana_ml_model_point_vector"]
+
+            # Valores de punto aún sin repartir en particiones por fuente (ver init_database.sql)
+            cursor.execute("""
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM pg_class
+                    WHERE relnamespace = 'public'::regnamespace
+                      AND (relname IN ('grafana_ml_model_point_value_legacy', 'grafana_ml_model_point_value_default')
+                           OR (relname = 'grafana_ml_model_point_value' AND relkind <> 'p'))
+                )
+            """)
+            pending_migration = cursor.fetchone()[0]
 
             # Si alguna de las tablas no existen, ejecutar el script
-            if not all(table in existing_tables for table in required_tables):
+            if pending_migration or not all(table in existing_tables for table in required_tables):
                 with open(schema_path, 'r', encoding='utf-8') as f:
                     sql_script = f.read()
 
@@ -103,9 +141,64 @@ class DatabaseConnection:
             if cursor is not None:
                 cursor.close()
     
+    def _ensure_indexes(self):
+        """
+        Crea los índices de indexes.sql que falten con CREATE INDEX CONCURRENTLY, de modo que una
+        instalación existente no bloquee sus tablas mientras se construyen. Un índice que quedó
+        inválido (una creación concurrente interrumpida) se elimina y se vuelve a crear.
+        """
+        indexes_path = Path(__file__).parent / "indexes.sql"
+        with open(indexes_path, 'r', encoding='utf-8') as f:
+            statements = [line.strip() for line in f if line.strip().upper().startswith("CREATE INDEX")]
+        indexes = {re.search(r"IF NOT EXISTS (\w+)", statement).group(1): statement for statement in statements}
+
+        # CONCURRENTLY no puede ejecutarse dentro de una transacción: se usa una conexión en modo autocommit
+        connection = connect(**self._config)
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                # No esperar indefinidamente a transacciones abiertas sobre las tablas (p. ej. otra ejecución en curso)
+                cursor.execute("SET lock_timeout = '30s'")
+                cursor.execute("""
+                    SELECT c.relname, i.indisvalid
+                    FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'public' AND c.relname = ANY(%s)
+                """, (list(indexes),))
+                existing = dict(cursor.fetchall())
+
+                for name, statement in indexes.items():
+                    if existing.get(name):
+                        continue
+                    try:
+                        if name in existing:
+                            logging.warning(f"Índice inválido {name}: se vuelve a crear")
+                            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                        cursor.execute(statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1))
+                        logging.info(f"Índice {name} creado")
+                    except Exception as e:
+                        # Un índice que no se pudo crear no impide arrancar: se reintenta en el siguiente arranque
+                        logging.warning(f"No se pudo crear el índice {name}: {e}")
+        finally:
+            connection.close()
+
+    def close_thread_connection(self):
+        """Cierra la conexión del hilo actual (p. ej. al terminar un hilo de trabajo)."""
+        connection = self._connection
+        if connection is not None:
+            if not connection.closed:
+                connection.close()
+            with self._lock:
+                self._connections.remove(connection)
+        self._local.connection = None
+
     def close(self):
-        if self._connection and not self._connection.closed:
-            self._connection.close()
-            logging.info("Conexión cerrada correctamente")
-        self._connection = None
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            if not connection.closed:
+                connection.close()
+                logging.info("Conexión cerrada correctamente")
+        self._local.connection = None
         self.__class__._instance = None
\ No newline at end of file
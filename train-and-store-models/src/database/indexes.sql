@@ -0,0 +1,46 @@
+-- Índices de las consultas frecuentes. DatabaseConnection los crea con CREATE INDEX CONCURRENTLY
+-- al arrancar, para no bloquear las tablas de una instalación existente. Cada sentencia debe ir
+-- en una sola línea y con la forma CREATE INDEX IF NOT EXISTS <nombre> ON <tabla> (...);
+
+-- Fuentes: reutilización de fuentes idénticas (SourceRepository.find_by_fingerprint)
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_source_fingerprint ON grafana_ml_model_source (fingerprint) WHERE watermark_column IS NULL;
+
+-- Modelos de una fuente
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_index_source ON grafana_ml_model_index (id_source);
+
+-- Características por fuente y búsqueda por nombre (DecisionTreeRepository.get_feature_id)
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_feature_source_name ON grafana_ml_model_feature (id_source, name);
+
+-- Puntos por fuente (delete_by_source y lecturas de paneles)
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_point_source ON grafana_ml_model_point (id_source, id);
+
+-- Los índices de grafana_ml_model_point_value están en init_database.sql: es una tabla particionada
+
+-- Clases de predicción por fuente
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_prediction_values_source ON grafana_ml_model_prediction_values (id_source);
+
+-- Clustering: delete_by_model, uniones de los paneles por modelo y claves foráneas hacia puntos y clusters
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_clustering_cluster_model ON grafana_ml_model_clustering_cluster (id_model);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmeans_point_model ON grafana_ml_model_kmeans_point (id_model, id_point);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmeans_point_cluster ON grafana_ml_model_kmeans_point (id_cluster);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmeans_point_point ON grafana_ml_model_kmeans_point (id_point);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmedoids_point_model ON grafana_ml_model_kmedoids_point (id_model, id_point);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmedoids_point_cluster ON grafana_ml_model_kmedoids_point (id_cluster);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_kmedoids_point_point ON grafana_ml_model_kmedoids_point (id_point);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_clustering_metrics_model ON grafana_ml_model_clustering_metrics (id_model);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_clustering_hierarchical_model ON grafana_ml_model_clustering_hierarchical (id_model);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_clustering_hierarchical_parent ON grafana_ml_model_clustering_hierarchical (id_parent);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_clustering_hierarchical_point ON grafana_ml_model_clustering_hierarchical (id_point);
+
+-- Correlación y regresión por modelo
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_correlation_model ON grafana_ml_model_correlation (id_model);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_regression_model ON grafana_ml_model_regression (id_model);
+
+-- Árbol de decisión: delete_by_model y claves foráneas entre nodos del mismo árbol
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_decision_tree_model ON grafana_ml_model_decision_tree (id_model);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_decision_tree_parent ON grafana_ml_model_decision_tree (parent_node);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_decision_tree_left ON grafana_ml_model_decision_tree (left_node);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_decision_tree_right ON grafana_ml_model_decision_tree (right_node);
+
+-- Reglas de asociación por modelo
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_association_rules_model ON grafana_ml_model_association_rules (id_model);
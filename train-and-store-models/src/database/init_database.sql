@@ -36,9 +36,19 @@ CREATE TABLE IF NOT EXISTS grafana_ml_model_source (
     name VARCHAR(255) NOT NULL,
     source VARCHAR(255) NOT NULL,
     description TEXT,
-    creator VARCHAR(255) 
+    creator VARCHAR(255),
+    watermark_column VARCHAR(255),
+    watermark_value TEXT,
+    fingerprint VARCHAR(64)
 );
 
+-- Marca de agua para la actualización incremental (instalaciones existentes)
+ALTER TABLE grafana_ml_model_source ADD COLUMN IF NOT EXISTS watermark_column VARCHAR(255);
+ALTER TABLE grafana_ml_model_source ADD COLUMN IF NOT EXISTS watermark_value TEXT;
+
+-- Huella del contenido cargado, para reutilizar fuentes idénticas (instalaciones existentes)
+ALTER TABLE grafana_ml_model_source ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64);
+
 -- Índice de modelos ML
 CREATE TABLE IF NOT EXISTS grafana_ml_model_index (
     id SERIAL PRIMARY KEY,
@@ -63,16 +73,121 @@ CREATE TABLE IF NOT EXISTS grafana_ml_model_point (
     name VARCHAR(255) NOT NULL
 );
 
--- Valores de los puntos de datos
+-- Migración a tabla particionada (instalaciones existentes): la tabla actual se renombra y
+-- sus valores se reparten más abajo en una partición por fuente
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+          AND c.relname = 'grafana_ml_model_point_value'
+          AND c.relkind = 'r'
+    ) THEN
+        ALTER TABLE grafana_ml_model_point_value RENAME TO grafana_ml_model_point_value_legacy;
+        ALTER TABLE grafana_ml_model_point_value_legacy
+            RENAME CONSTRAINT grafana_ml_model_point_value_pkey TO grafana_ml_model_point_value_legacy_pkey;
+        ALTER INDEX IF EXISTS idx_grafana_ml_model_point_value_point
+            RENAME TO idx_grafana_ml_model_point_value_legacy_point;
+        ALTER INDEX IF EXISTS idx_grafana_ml_model_point_value_feature
+            RENAME TO idx_grafana_ml_model_point_value_legacy_feature;
+    END IF;
+END $$;
+
+-- Valores de los puntos de datos, con una partición por fuente (creada al cargarla). No hay
+-- partición DEFAULT: con ella PostgreSQL no permite DETACH PARTITION CONCURRENTLY al borrar una fuente
 CREATE TABLE IF NOT EXISTS grafana_ml_model_point_value (
-    id_source INTEGER NOT NULL REFERENCES grafana_ml_model_source(id),
-    id_point INTEGER NOT NULL REFERENCES grafana_ml_model_point(id),
-    id_feature INTEGER NOT NULL REFERENCES grafana_ml_model_feature(id),
+    id_source INTEGER NOT NULL REFERENCES grafana_ml_model_source(id) DEFERRABLE INITIALLY IMMEDIATE,
+    id_point INTEGER NOT NULL REFERENCES grafana_ml_model_point(id) DEFERRABLE INITIALLY IMMEDIATE,
+    id_feature INTEGER NOT NULL REFERENCES grafana_ml_model_feature(id) DEFERRABLE INITIALLY IMMEDIATE,
     numeric_value DOUBLE PRECISION,
     string_value VARCHAR(255),
     PRIMARY KEY (id_source, id_point, id_feature)
+) PARTITION BY LIST (id_source);
+
+-- Reparto de los valores antiguos en una partición por fuente: la tabla renombrada o la partición
+-- DEFAULT de una versión anterior. Cada fuente se lee por la clave primaria (id_source primero)
+DO $$
+DECLARE
+    legacy TEXT;
+    legacy_source INTEGER;
+    partition_name TEXT;
+BEGIN
+    IF to_regclass('grafana_ml_model_point_value_default') IS NOT NULL AND EXISTS (
+        SELECT 1 FROM pg_inherits WHERE inhrelid = 'grafana_ml_model_point_value_default'::regclass
+    ) THEN
+        ALTER TABLE grafana_ml_model_point_value DETACH PARTITION grafana_ml_model_point_value_default;
+    END IF;
+
+    FOREACH legacy IN ARRAY ARRAY['grafana_ml_model_point_value_legacy', 'grafana_ml_model_point_value_default'] LOOP
+        CONTINUE WHEN to_regclass(legacy) IS NULL;
+
+        FOR legacy_source IN EXECUTE format('SELECT DISTINCT id_source FROM %I', legacy) LOOP
+            partition_name := 'grafana_ml_model_point_value_' || legacy_source;
+            EXECUTE format('CREATE TABLE %I (LIKE grafana_ml_model_point_value)', partition_name);
+            EXECUTE format(
+                'INSERT INTO %I (id_source, id_point, id_feature, numeric_value, string_value) '
+                'SELECT id_source, id_point, id_feature, numeric_value, string_value FROM %I WHERE id_source = %s',
+                partition_name, legacy, legacy_source
+            );
+            EXECUTE format(
+                'ALTER TABLE grafana_ml_model_point_value ATTACH PARTITION %I FOR VALUES IN (%s)',
+                partition_name, legacy_source
+            );
+        END LOOP;
+
+        EXECUTE format('DROP TABLE %I', legacy);
+    END LOOP;
+END $$;
+
+-- Comprobación de claves foráneas al borrar puntos y características. Se definen aquí porque
+-- CREATE INDEX CONCURRENTLY no admite tablas particionadas (ver indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_point_value_point ON grafana_ml_model_point_value (id_point);
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_point_value_feature ON grafana_ml_model_point_value (id_feature);
+
+-- Claves foráneas aplazables para la carga masiva (instalaciones existentes)
+DO $$
+DECLARE
+    fk RECORD;
+BEGIN
+    FOR fk IN
+        SELECT conname
+        FROM pg_constraint
+        WHERE conrelid = 'grafana_ml_model_point_value'::regclass
+          AND contype = 'f'
+          AND NOT condeferrable
+    LOOP
+        EXECUTE format('ALTER TABLE grafana_ml_model_point_value ALTER CONSTRAINT %I DEFERRABLE INITIALLY IMMEDIATE', fk.conname);
+    END LOOP;
+END $$;
+
+-- Representación densa de los puntos: valores numéricos de todas las características
+-- (ordenadas por id, NULL si el valor no es numérico) y valor de la variable objetivo
+CREATE TABLE IF NOT EXISTS grafana_ml_model_point_vector (
+    id_source INTEGER NOT NULL REFERENCES grafana_ml_model_source(id),
+    id_point INTEGER PRIMARY KEY REFERENCES grafana_ml_model_point(id),
+    numeric_values DOUBLE PRECISION[] NOT NULL,
+    target_numeric DOUBLE PRECISION,
+    target_string VARCHAR(255)
 );
 
+CREATE INDEX IF NOT EXISTS idx_grafana_ml_model_point_vector_source
+    ON grafana_ml_model_point_vector (id_source, id_point);
+
+-- Generar los vectores de las fuentes cargadas antes de existir la tabla
+INSERT INTO grafana_ml_model_point_vector (id_source, id_point, numeric_values, target_numeric, target_string)
+SELECT
+    pv.id_source,
+    pv.id_point,
+    array_agg(pv.numeric_value ORDER BY pv.id_feature),
+    MAX(pv.numeric_value) FILTER (WHERE f.is_target),
+    MAX(pv.string_value) FILTER (WHERE f.is_target)
+FROM grafana_ml_model_point_value pv
+JOIN grafana_ml_model_feature f ON f.id = pv.id_feature
+WHERE NOT EXISTS (SELECT 1 FROM grafana_ml_model_point_vector v WHERE v.id_point = pv.id_point)
+GROUP BY pv.id_source, pv.id_point;
+
 -- Valores de predicción para modelos de clasificación
 CREATE TABLE IF NOT EXISTS grafana_ml_model_prediction_values (
     id_source INTEGER NOT NULL REFERENCES grafana_ml_model_source(id),
@@ -214,10 +329,15 @@ CREATE TABLE IF NOT EXISTS grafana_ml_model_source_create (
     creator VARCHAR(255),
     source VARCHAR(255) NOT NULL,
     target VARCHAR(255),
+    watermark VARCHAR(255),
+    parameters JSON DEFAULT '{}',
     state state NOT NULL DEFAULT 'pendiente',
     id_source INTEGER
 );
 
+ALTER TABLE grafana_ml_model_source_create ADD COLUMN IF NOT EXISTS watermark VARCHAR(255);
+ALTER TABLE grafana_ml_model_source_create ADD COLUMN IF NOT EXISTS parameters JSON DEFAULT '{}';
+
 -- Trigger para prevenir inserción manual de id_source
 CREATE OR REPLACE FUNCTION prevent_insert_id_source()
 RETURNS trigger AS $$
@@ -251,3 +371,11 @@ CREATE TABLE IF NOT EXISTS grafana_ml_model_source_delete (
     state state NOT NULL DEFAULT 'pendiente',
     date DATE NOT NULL DEFAULT CURRENT_DATE
 );
+
+-- Tareas de actualización incremental de fuentes
+CREATE TABLE IF NOT EXISTS grafana_ml_model_source_refresh (
+    id SERIAL PRIMARY KEY,
+    id_source INTEGER NOT NULL,
+    state state NOT NULL DEFAULT 'pendiente',
+    date DATE NOT NULL DEFAULT CURRENT_DATE
+);
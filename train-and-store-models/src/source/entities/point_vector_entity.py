@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ...utils.utils import Utils
+
+
+@dataclass
+class PointVector:
+    id_source: int
+    id_point: int
+    numeric_values: List[Optional[float]] = field(default_factory=list)
+    target_numeric: Optional[float] = None
+    target_string: Optional[str] = None
+
+    def __post_init__(self):
+        # Convertir los valores de tipo NumPy a tipos nativos de Python
+        self.id_source = Utils.to_native(self.id_source)
+        self.id_point = Utils.to_native(self.id_point)
+        self.numeric_values = [Utils.to_native(v) for v in self.numeric_values]
+        self.target_numeric = Utils.to_native(self.target_numeric)
@@ -0,0 +1,30 @@
+from dataclasses import dataclass, fields
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass
+class SourceData:
+    """
+    Datos de una fuente en forma columnar: una fila por punto (ordenados por id) y una columna
+    por característica (ordenadas por id), incluida la variable objetivo.
+    """
+    point_ids: np.ndarray           # int64 (puntos)
+    point_names: np.ndarray         # str (puntos)
+    feature_ids: np.ndarray         # int64 (características)
+    feature_names: np.ndarray       # str (características)
+    is_target: np.ndarray           # bool (características)
+    values: np.ndarray              # float64 (puntos x características), NaN si el valor no es numérico
+    target_labels: np.ndarray       # str (puntos): objetivo como texto, vacío si la fuente no tiene objetivo
+    categorical_target: np.ndarray  # bool 0-d: la variable objetivo tiene valores de texto
+    class_ids: np.ndarray           # int64 (clases de predicción)
+    class_names: np.ndarray         # str (clases de predicción)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays de la entidad, para guardarla en la caché en disco."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "SourceData":
+        return cls(**{f.name: arrays[f.name] for f in fields(cls)})
@@ -11,6 +11,9 @@ class Source:
     creator: Optional[str] = None 
     description: Optional[str] = None  
     id: Optional[int] = None  
+    watermark_column: Optional[str] = None
+    watermark_value: Optional[str] = None
+    fingerprint: Optional[str] = None
     
     def __post_init__(self):
         # Convertir los valores de tipo NumPy a tipos nativos de Python
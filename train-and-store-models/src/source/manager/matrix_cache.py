@@ -0,0 +1,105 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from ...utils.utils import Utils
+
+
+class MatrixCache:
+    """
+    Caché en disco de las matrices de una fuente, en ficheros .npy que se abren con memoria mapeada.
+    Cada entrada vive en '<directorio>/source_<id>/<versión>/<vista>/' y guarda un fichero por array
+    (matriz de características, ids y nombres de los puntos, objetivo...). El tamaño total está acotado:
+    al superarlo se eliminan las entradas usadas hace más tiempo.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        settings = Utils.load_cache_settings()
+        self.enabled = settings["enabled"]
+        self.directory = settings["directory"]
+        self.max_size = settings["max_size_mb"] * 1024 * 1024
+
+    def load(self, id_source: int, version: str, view: str) -> Optional[Dict[str, np.ndarray]]:
+        """Arrays de la entrada (abiertos con mmap_mode='r'), o None si no está en caché."""
+        if not self.enabled:
+            return None
+        path = self._entry_path(id_source, version, view)
+        if not os.path.isdir(path):
+            return None
+        try:
+            arrays = {
+                name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                for name in os.listdir(path) if name.endswith('.npy')
+            }
+            # La fecha de modificación marca el último uso para el desalojo LRU
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"No se pudo leer la caché de la fuente {id_source}: {e}")
+            return None
+        return arrays
+
+    def store(self, id_source: int, version: str, view: str, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Guarda los arrays de una vista. Los arrays de objetos (p. ej. con valores nulos)
+        no se pueden mapear en memoria, así que en ese caso la vista no se guarda.
+        """
+        if not self.enabled or any(np.asarray(a).dtype == object for a in arrays.values()):
+            return
+
+        path = self._entry_path(id_source, version, view)
+        source_path = os.path.join(self.directory, f"source_{id_source}")
+        try:
+            os.makedirs(source_path, exist_ok=True)
+            # Se escribe en un directorio temporal y se renombra para no dejar entradas a medias
+            tmp_path = tempfile.mkdtemp(dir=source_path, prefix=".tmp_")
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+
+            with self._lock:
+                # Las versiones anteriores de la fuente ya no se pueden usar
+                for entry in os.listdir(source_path):
+                    if entry != version and not entry.startswith(".tmp_"):
+                        shutil.rmtree(os.path.join(source_path, entry), ignore_errors=True)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                os.replace(tmp_path, path)
+                self._evict()
+        except OSError as e:
+            logging.warning(f"No se pudo guardar la caché de la fuente {id_source}: {e}")
+
+    def invalidate(self, id_source: int) -> None:
+        """Elimina todas las entradas de una fuente (al borrarla o actualizarla)."""
+        with self._lock:
+            shutil.rmtree(os.path.join(self.directory, f"source_{id_source}"), ignore_errors=True)
+
+    def _entry_path(self, id_source: int, version: str, view: str) -> str:
+        return os.path.join(self.directory, f"source_{id_source}", version, view)
+
+    def _evict(self) -> None:
+        """Elimina las entradas menos usadas recientemente hasta quedar por debajo del tamaño máximo."""
+        entries = []
+        for source_entry in os.scandir(self.directory):
+            if not source_entry.is_dir():
+                continue
+            for version_entry in os.scandir(source_entry.path):
+                if not version_entry.is_dir() or version_entry.name.startswith(".tmp_"):
+                    continue
+                for view_entry in os.scandir(version_entry.path):
+                    if view_entry.is_dir():
+                        size = sum(f.stat().st_size for f in os.scandir(view_entry.path) if f.is_file())
+                        entries.append((view_entry.stat().st_mtime, size, view_entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,38 @@
+from typing import List, Tuple
+
+from ...database.database_connection import DatabaseConnection
+from ...database.unit_of_work import UnitOfWork
+from ..repositories.point_value_repository import PointValueRepository
+from .table_loader import TableLoader
+
+
+def ingest_block_range(source_id: int, source: str, columns: List[Tuple[str, str]], feature_ids: List[int],
+                       target_column: str, blocks: Tuple[int, int], name_offset: int, snapshot: str,
+                       defer_constraints: bool) -> Tuple[int, list]:
+    """
+    Carga en un proceso de trabajo las filas de la tabla almacenadas en el rango de bloques `blocks`,
+    en su propia transacción y leyendo con la instantánea `snapshot` exportada por el proceso principal.
+    Los puntos se numeran a partir de `name_offset` (filas de los rangos anteriores), con los mismos
+    nombres que en los otros modos. Devuelve el número de valores insertados y las clases de la
+    variable objetivo encontradas en el rango, en orden de aparición.
+    """
+    # Primera instancia del proceso: sin volver a comprobar el esquema ni los índices
+    database = DatabaseConnection.for_worker()
+    table_loader = TableLoader()
+
+    try:
+        with UnitOfWork(database.connection):
+            table_loader.import_snapshot(snapshot)
+            select = table_loader.build_select(source, columns, blocks=blocks)
+            inserted = PointValueRepository().add_from_query(
+                source_id,
+                select,
+                [(id_feature, name, kind in ('numeric', 'boolean')) for id_feature, (name, kind) in zip(feature_ids, columns)],
+                name_offset=name_offset,
+                defer_constraints=defer_constraints
+            )
+            target_values = table_loader.fetch_distinct(select, target_column) if target_column else []
+        return inserted, target_values
+    finally:
+        # Solo se cierra la conexión: el proceso conserva el singleton (y su inicialización) para los siguientes rangos
+        database.close_thread_connection()
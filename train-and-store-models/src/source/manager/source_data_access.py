@@ -0,0 +1,159 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ...exceptions.exceptions import NotEnoughVariablesException, NoTargetException
+from ...utils.utils import Utils
+from ..entities.source_data_entity import SourceData
+from ..repositories.source_repository import SourceRepository
+from .matrix_cache import MatrixCache
+from .source_data_cache import SourceDataCache
+
+
+class SourceDataAccess:
+    """
+    Acceso único a los datos de las fuentes para los algoritmos de crc y da. La fuente se lee una
+    sola vez en forma columnar (SourceData), guardada en la caché en disco mientras su versión no
+    cambie y en la caché en memoria durante la ejecución, y de ella se obtienen todas las vistas.
+    Las vistas también se guardan en la caché en memoria: los modelos de una ejecución las comparten.
+    """
+
+    @classmethod
+    def load(cls, id_source: int) -> SourceData:
+        """Datos columnares de la fuente."""
+        return SourceDataCache.get_or_load(id_source, "columnar", lambda: cls._load(id_source))
+
+    @classmethod
+    def numeric(cls, id_source: int) -> Dict[str, np.ndarray]:
+        """
+        Vista numérica (clustering y correlaciones): características no objetivo y la variable objetivo
+        si es numérica, con la precisión de [models] precision.
+        """
+        return SourceDataCache.get_or_load(id_source, "numeric", lambda: cls._numeric(cls.load(id_source)))
+
+    @classmethod
+    def with_target(cls, id_source: int) -> Dict[str, np.ndarray]:
+        """
+        Vista con variable objetivo (regresiones), siempre en float64: calculan errores estándar
+        y p-valores sobre ella. El objetivo es numérico, o de texto si es categórico.
+        """
+        return SourceDataCache.get_or_load(id_source, "numeric_target", lambda: cls._with_target(cls.load(id_source)))
+
+    @classmethod
+    def classification(cls, id_source: int) -> Tuple[np.ndarray, np.ndarray, List[dict], List[dict]]:
+        """Vista de clasificación (árbol de decisión): X, objetivo como texto, características y clases."""
+        return SourceDataCache.get_or_load(
+            id_source, "classification", lambda: cls._classification(cls.load(id_source))
+        )
+
+    @classmethod
+    def binary(cls, id_source: int) -> Tuple[np.ndarray, List[dict]]:
+        """Vista binaria (reglas de asociación): características numéricas cuyos valores son todos 0 o 1."""
+        return SourceDataCache.get_or_load(id_source, "binary", lambda: cls._binary(cls.load(id_source)))
+
+    @staticmethod
+    def _load(id_source: int) -> SourceData:
+        """Lee la fuente de la caché en disco o, si su versión ha cambiado, de la base de datos."""
+        source_repository = SourceRepository()
+        cache = MatrixCache()
+
+        version = source_repository.get_version(id_source)
+        arrays = cache.load(id_source, version, "columnar")
+        if arrays is not None:
+            try:
+                return SourceData.from_arrays(arrays)
+            except KeyError:
+                # Entrada guardada con otro formato: se vuelve a leer
+                pass
+
+        data = source_repository.get_source_data(id_source)
+        cache.store(id_source, version, "columnar", data.to_arrays())
+        return data
+
+    @staticmethod
+    def _columns(data: SourceData, mask: np.ndarray, dtype: np.dtype = np.float64) -> np.ndarray:
+        """Columnas indicadas de la matriz, sin copiarla si se piden todas con su mismo tipo."""
+        values = data.values if mask.all() else data.values[:, mask]
+        return values.astype(dtype, copy=False)
+
+    @staticmethod
+    def _features(data: SourceData, mask: np.ndarray) -> List[dict]:
+        return [
+            {'id_feature': int(id), 'name': str(name)}
+            for id, name in zip(data.feature_ids[mask], data.feature_names[mask])
+        ]
+
+    @staticmethod
+    def _target_index(data: SourceData) -> int:
+        """Posición de la variable objetivo entre las características, o -1 si no tiene."""
+        positions = np.flatnonzero(data.is_target)
+        return int(positions[0]) if positions.size else -1
+
+    @classmethod
+    def _numeric_mask(cls, data: SourceData) -> np.ndarray:
+        """Características con valores numéricos: las no objetivo y el objetivo solo si tiene alguno."""
+        mask = ~data.is_target
+        target = cls._target_index(data)
+        if target >= 0 and not data.categorical_target and not np.isnan(data.values[:, target]).all():
+            mask[target] = True
+        return mask
+
+    @classmethod
+    def _numeric(cls, data: SourceData) -> Dict[str, np.ndarray]:
+        mask = cls._numeric_mask(data)
+        if mask.sum() < 2:
+            raise NotEnoughVariablesException("Se requieren al menos dos características numéricas para ejecutar el algoritmo.")
+
+        return {
+            "features": cls._columns(data, mask, Utils.get_matrix_dtype()),
+            "point_ids": data.point_ids,
+            "point_names": data.point_names,
+            "feature_ids": data.feature_ids[mask]
+        }
+
+    @classmethod
+    def _with_target(cls, data: SourceData) -> Dict[str, np.ndarray]:
+        mask = ~data.is_target
+        if not mask.any():
+            raise NotEnoughVariablesException("Se requiere al menos una característica numérica para ejecutar el algoritmo.")
+        target = cls._target_index(data)
+        if target < 0:
+            raise NoTargetException("No se encontró una variable objetivo en las características.")
+
+        return {
+            "features": cls._columns(data, mask),
+            "target": data.target_labels if data.categorical_target else data.values[:, target],
+            "feature_ids": data.feature_ids[mask]
+        }
+
+    @classmethod
+    def _classification(cls, data: SourceData) -> Tuple[np.ndarray, np.ndarray, List[dict], List[dict]]:
+        target = cls._target_index(data)
+        if target < 0:
+            raise ValueError("No se encontró una variable objetivo.")
+
+        if not data.categorical_target:
+            values = data.values[:, target]
+            if np.unique(values[~np.isnan(values)]).size != 2:
+                raise ValueError("La variable objetivo debe ser categórica o numérica binaria.")
+
+        # El árbol trabaja internamente en float32: con esa precisión configurada no se pierde nada
+        mask = ~data.is_target
+        X = cls._columns(data, mask, Utils.get_matrix_dtype())
+        class_list = [
+            {'id_prediction': int(id), 'name': str(name)}
+            for id, name in zip(data.class_ids, data.class_names)
+        ]
+        return X, data.target_labels, cls._features(data, mask), class_list
+
+    @classmethod
+    def _binary(cls, data: SourceData) -> Tuple[np.ndarray, List[dict]]:
+        # Una columna es binaria si todos sus valores son 0 o 1 (NaN no lo es)
+        mask = cls._numeric_mask(data)
+        mask[mask] = ((data.values[:, mask] == 0) | (data.values[:, mask] == 1)).all(axis=0)
+
+        # Comprobar si hay al menos 2 características binarias
+        if mask.sum() < 2:
+            raise NotEnoughVariablesException("Se requieren al menos dos características binarias para ejecutar el algoritmo.")
+
+        return data.values[:, mask] == 1, cls._features(data, mask)
@@ -0,0 +1,89 @@
+import dataclasses
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple, TypeVar
+
+import numpy as np
+
+from ...utils.utils import Utils
+
+T = TypeVar('T')
+
+
+class SourceDataCache:
+    """
+    Caché en memoria de los datos ya cargados de las fuentes durante una ejecución del planificador,
+    usada por SourceDataAccess. Cada entrada se identifica por (id_source, vista): los datos columnares
+    ('columnar') y las vistas 'numeric', 'numeric_target', 'classification' y 'binary' obtenidas de ellos.
+    El tamaño total está acotado por [cache] memory_mb: al superarlo se descartan las entradas
+    usadas hace más tiempo.
+    """
+
+    _entries: "OrderedDict[Tuple[int, str], Tuple[object, int]]" = OrderedDict()
+    _size = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_or_load(cls, id_source: int, view: str, loader: Callable[[], T]) -> T:
+        """Devuelve la vista de la fuente, cargándola con `loader` solo si no está en memoria."""
+        key = (id_source, view)
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                return cls._entries[key][0]
+
+        value = loader()
+        cls._freeze(value)
+        size = cls._sizeof(value)
+        max_size = Utils.load_cache_settings()["memory_mb"] * 1024 * 1024
+
+        with cls._lock:
+            if size <= max_size:
+                if key in cls._entries:
+                    cls._size -= cls._entries.pop(key)[1]
+                cls._entries[key] = (value, size)
+                cls._size += size
+                while cls._size > max_size:
+                    _, (_, evicted) = cls._entries.popitem(last=False)
+                    cls._size -= evicted
+        return value
+
+    @classmethod
+    def invalidate(cls, id_source: int) -> None:
+        """Descarta todas las vistas de una fuente."""
+        with cls._lock:
+            for key in [k for k in cls._entries if k[0] == id_source]:
+                cls._size -= cls._entries.pop(key)[1]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Vacía la caché (al empezar y terminar cada ejecución del planificador)."""
+        with cls._lock:
+            cls._entries.clear()
+            cls._size = 0
+
+    @classmethod
+    def _freeze(cls, value) -> None:
+        """Marca los arrays como de solo lectura: la misma vista se entrega a varios modelos."""
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        elif dataclasses.is_dataclass(value):
+            cls._freeze(vars(value))
+        elif isinstance(value, (list, tuple, dict)):
+            for item in (value.values() if isinstance(value, dict) else value):
+                if isinstance(item, np.ndarray):
+                    item.setflags(write=False)
+
+    @classmethod
+    def _sizeof(cls, value: object) -> int:
+        """Tamaño aproximado en bytes de una vista (arrays de NumPy, listas, tuplas, diccionarios y dataclasses)."""
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if dataclasses.is_dataclass(value):
+            return cls._sizeof(vars(value))
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(cls._sizeof(item) for item in value)
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(cls._sizeof(item) for item in value.values())
+        return sys.getsizeof(value)
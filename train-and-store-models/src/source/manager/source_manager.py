@@ -1,21 +1,31 @@
+import hashlib
+import logging
+import multiprocessing
 import numbers
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 
 import numpy as np
-from psycopg2.errors import ForeignKeyViolation
+import pandas as pd
+from psycopg2.errors import ForeignKeyViolation, LockNotAvailable
 
 from ...database.database_connection import DatabaseConnection
 from ...database.unit_of_work import UnitOfWork
+from ...utils.utils import Utils
 from ..entities.feature_entity import Feature
 from ..entities.point_entity import Point
-from ..entities.point_value_entity import PointValue
 from ..entities.prediction_value_entity import PredictionValue
 from ..entities.source_entity import Source
 from ..repositories.feature_repository import FeatureRepository
 from ..repositories.point_repository import PointRepository
 from ..repositories.point_value_repository import PointValueRepository
+from ..repositories.point_vector_repository import PointVectorRepository
 from ..repositories.prediction_value_repository import \
     PredictionValueRepository
 from ..repositories.source_repository import SourceRepository
+from .matrix_cache import MatrixCache
+from .parallel_ingest import ingest_block_range
+from .source_data_cache import SourceDataCache
 from .table_loader import TableLoader
 
 
@@ -26,103 +36,424 @@ class SourceManager:
         self.source_repo = SourceRepository()
         self.point_repo = PointRepository()
         self.point_value_repo = PointValueRepository()
+        self.point_vector_repo = PointVectorRepository()
         self.feature_repo = FeatureRepository()
         self.prediction_value_repo = PredictionValueRepository()
+        self.matrix_cache = MatrixCache()
+        self.ingest_settings = Utils.load_ingest_settings()
+
+    def create(self, source_name: str, source_description: str, creator: str, target_column: str, source: str,
+               watermark_column: Optional[str] = None, parameters: Optional[dict] = None):
+        """
+        Crea una fuente y carga puntos, características y valores desde una tabla.
+        Si se indica `watermark_column` (clave creciente o marca de tiempo), se guarda su valor máximo
+        para que las actualizaciones posteriores carguen solo las filas nuevas.
+        `parameters` admite un muestreo de la tabla (ver `_get_sampling`).
+        Si ya existe una fuente con el mismo contenido, se devuelve su id en lugar de cargarla de nuevo:
+        la fuente (con el nombre y la descripción de la primera tarea) queda compartida por ambas, y
+        sus datos solo se eliminan cuando se elimina la última (ver `delete`).
+        Si la carga falla, se eliminan la fuente y su partición.
+        """
+        sampling = self._get_sampling(parameters or {})
+        if sampling and watermark_column:
+            raise ValueError("No se puede combinar el muestreo con una columna de marca de agua.")
+        if self.ingest_settings["row_limit"] and watermark_column:
+            # La marca de agua es el máximo de toda la tabla: las filas no cargadas no se leerían nunca
+            raise ValueError("No se puede combinar un límite de filas con una columna de marca de agua.")
+
+        bounds = None
+        watermark_value = None
+        fingerprint = None
+        if watermark_column:
+            watermark_value = self.table_loader.get_watermark(source, watermark_column)
+            bounds = (watermark_column, None, watermark_value)
+        elif self.ingest_settings["reuse_identical"]:
+            # Las fuentes con marca de agua cambian al actualizarse, por lo que no se comparten
+            fingerprint = self._fingerprint(source, target_column, sampling)
+            existing_id = self.source_repo.find_by_fingerprint(fingerprint)
+            if existing_id is not None:
+                logging.info(f"La tabla {source} ya está cargada en la fuente {existing_id}; se reutiliza.")
+                return existing_id
 
-    def create(self, source_name: str, source_description: str, creator: str, target_column: str, source: str):
-        """ Crea una fuente y carga puntos, características y valores desde una tabla. """
         new_source = Source(
             name=source_name,
             source=source,
             description=source_description,
-            creator=creator
+            creator=creator,
+            watermark_column=watermark_column,
+            watermark_value=watermark_value
         )
         self.source_repo.add(new_source)
         source_id = new_source.id
 
-        df = self.table_loader.load_dataframe(source, target_column)
-
-        points = []
-        for index in df.index:
-            point = Point(id_source=source_id, name=f"point_{index + 1}")
-            self.point_repo.add(point)
-            points.append(point.id)
-
-        features = []
-        for column in df.columns:
-            is_target = column == target_column
-            feature = Feature(id_source=source_id, name=column, is_target=is_target)
-            self.feature_repo.add(feature)
-            features.append(feature)
-
-        for i, row in df.iterrows():
-                for feature in features:
-                    value = row[feature.name]
-
-                    # Convertir a tipo int o float si es un tipo numpy
-                    if isinstance(value, (np.integer, np.floating)):
-                        value = value.item()  # Convierte numpy.int64, numpy.float64, etc., a un tipo nativo de Python
-
-                    # Determinar si el valor es numérico (incluye tipos de numpy y nativos de Python)
-                    if isinstance(value, (numbers.Number)):
-                        numeric_value = value
-                        string_value = None
-                    elif isinstance(value, str):
-                        numeric_value = None
-                        string_value = value
-                    else:
-                        # Si el valor no es ni numérico ni cadena, se descarta
-                        numeric_value = None
-                        string_value = None
-
-                    # Crear el objeto PointValue
-                    point_value = PointValue(
-                        id_source=source_id,
-                        id_point=points[i],
-                        id_feature=feature.id,
-                        numeric_value=numeric_value,
-                        string_value=string_value
-                    )
-
-                    # Guardar el objeto PointValue en el repositorio
-                    self.point_value_repo.add(point_value)
-                
-
-        # Guardar los valores posibles de la variable objetivo (categórica o binaria)
-        target_feature = next((f for f in features if f.is_target), None)
-        if target_feature:
-            target_values = df[target_feature.name].dropna().unique()
-
-            if all(isinstance(v, str) for v in target_values):
-                # Caso categórico
-                for class_value in target_values:
-                    prediction = PredictionValue(
-                        id_source=source_id,
-                        class_name=class_value
-                    )
-                    self.prediction_value_repo.add(prediction)
-
-            elif all(isinstance(v, (int, float, np.integer, np.floating)) for v in target_values):
-                # Caso binario (solo 2 valores distintos)
-                bin_classes = set(target_values)
-                if len(bin_classes) == 2:
-                    for class_value in sorted(bin_classes):
-                        prediction = PredictionValue(
-                            id_source=source_id,
-                            class_name=str(class_value)  
-                        )
-                        self.prediction_value_repo.add(prediction)
+        try:
+            self.point_value_repo.create_partition(source_id)
+
+            with UnitOfWork(self.database.connection):
+                features, target_values = self._ingest(
+                    source_id, source, target_column, bounds=bounds, limit=self.ingest_settings["row_limit"] or None,
+                    sampling=sampling
+                )
+                # Una tabla sin filas completas en sus columnas útiles no da lugar a una fuente vacía
+                if not features or not self.point_repo.count_by_source(source_id):
+                    raise ValueError(f"La tabla {source} no tiene filas con datos que cargar.")
+                self.point_vector_repo.add_from_values(source_id)
+
+                # Guardar los valores posibles de la variable objetivo (categórica o binaria)
+                if features and any(f.is_target for f in features):
+                    self._save_prediction_values(source_id, target_values)
+
+                # La huella se confirma junto con los datos: una carga fallida no se reutiliza nunca
+                if fingerprint:
+                    self.source_repo.update_fingerprint(source_id, fingerprint)
+        except Exception:
+            self.database.connection.rollback()
+            self._remove(source_id)
+            raise
 
         return new_source.id 
 
-    def delete(self, source_id: int):
+    def refresh(self, source_id: int) -> int:
+        """
+        Añade a la fuente las filas nuevas de su tabla, es decir, las que superan la marca de agua
+        guardada, reutilizando sus características. Devuelve el número de puntos añadidos.
+        """
+        source = self.source_repo.get(source_id)
+        if not source.watermark_column:
+            raise ValueError(f"La fuente con id {source_id} no tiene columna de marca de agua.")
+
+        # Se fija el límite superior antes de leer: las filas que lleguen durante la carga quedan para la siguiente
+        watermark_value = self.table_loader.get_watermark(source.source, source.watermark_column)
+        if watermark_value is None or watermark_value == source.watermark_value:
+            return 0
+
+        with UnitOfWork(self.database.connection):
+            features = self.feature_repo.get_by_source(source_id)
+            target = next((f.name for f in features if f.is_target), None)
+            first_number = self.point_repo.get_last_number(source_id)
+            last_point = self.point_repo.get_last_id(source_id)
+            points_before = self.point_repo.count_by_source(source_id)
+
+            _, target_values = self._ingest(
+                source_id,
+                source.source,
+                target,
+                features=features,
+                bounds=(source.watermark_column, source.watermark_value, watermark_value),
+                offset=first_number
+            )
+            # Solo los puntos nuevos: el coste depende de las filas añadidas, no del tamaño de la fuente
+            self.point_vector_repo.add_from_values(source_id, after_point=last_point)
+
+            # Solo se añaden clases categóricas nuevas; una objetivo binaria conserva sus dos clases
+            existing = {p.class_name for p in self.prediction_value_repo.get_by_source(source_id)}
+            new_classes = [v for v in target_values if isinstance(v, str) and v not in existing]
+            if existing and new_classes:
+                self.prediction_value_repo.add_prediction_values(
+                    [PredictionValue(id_source=source_id, class_name=v) for v in new_classes]
+                )
+
+            self.source_repo.update_watermark(source_id, watermark_value)
+            added = self.point_repo.count_by_source(source_id) - points_before
+
+        # Las matrices guardadas de la fuente ya no reflejan sus puntos
+        self.matrix_cache.invalidate(source_id)
+        SourceDataCache.invalidate(source_id)
+        return added
+
+    @staticmethod
+    def _get_sampling(parameters: dict) -> Optional[dict]:
+        """
+        Valida los parámetros de muestreo de la tarea. Devuelve None si no se pide muestreo.
+        - sample_method: "bernoulli" o "system" (TABLESAMPLE, requiere sample_fraction entre 0 y 1)
+          o "hash" (requiere sample_size, entero positivo).
+        - seed: semilla entera para que la muestra sea reproducible (0 por defecto).
+        """
+        method = parameters.get("sample_method")
+        if method is None:
+            return None
+
+        seed = parameters.get("seed", 0)
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise ValueError(f"La semilla '{seed}' no es válida. Debe ser un entero.")
+
+        if method in ("bernoulli", "system"):
+            fraction = parameters.get("sample_fraction")
+            if not isinstance(fraction, (int, float)) or isinstance(fraction, bool) or not 0 < fraction <= 1:
+                raise ValueError(f"La fracción de muestreo '{fraction}' no es válida. Debe ser un número entre 0 y 1.")
+            return {"method": method, "fraction": float(fraction), "seed": seed}
+
+        if method == "hash":
+            size = parameters.get("sample_size")
+            if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+                raise ValueError(f"El tamaño de muestra '{size}' no es válido. Debe ser un entero positivo.")
+            return {"method": method, "size": size, "seed": seed}
+
+        raise ValueError(f"Método de muestreo no soportado: {method}")
+
+    def _fingerprint(self, source: str, target_column: str, sampling: Optional[dict] = None) -> str:
+        """Huella de la fuente: contenido de la tabla más los parámetros que cambian lo que se carga."""
+        row_count, columns_hash, rows_hash = self.table_loader.fingerprint(source)
+        sample = ",".join(f"{k}={v}" for k, v in sorted((sampling or {}).items()))
+        key = (f"{row_count}|{columns_hash}|{rows_hash}|{target_column or ''}|"
+               f"{self.ingest_settings['row_limit']}|{sample}")
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _ingest(self, source_id: int, source: str, target_column: str, features: Optional[List[Feature]] = None,
+                bounds=None, offset: int = 0, limit: Optional[int] = None,
+                sampling: Optional[dict] = None) -> Tuple[List[Feature], list]:
+        """
+        Carga la tabla según el modo configurado. Devuelve las características y las clases encontradas.
+        `limit` solo se aplica en la creación: una actualización carga siempre todo el rango nuevo.
+        """
+        mode = self.ingest_settings["mode"]
+        if mode == "parallel" and features is None and not (bounds or limit or sampling):
+            result = self._ingest_parallel(source_id, source, target_column)
+            if result is not None:
+                return result
+
+        # El modo paralelo recurre a la carga en el servidor cuando no puede repartir la tabla
+        if mode in ("server", "parallel"):
+            return self._ingest_in_database(source_id, source, target_column, features, bounds, offset, limit, sampling)
+        return self._ingest_stream(source_id, source, target_column, features, bounds, offset, limit, sampling)
+
+    def _ingest_parallel(self, source_id: int, source: str, target_column: str) -> Optional[Tuple[List[Feature], list]]:
+        """
+        Reparte la tabla en rangos de bloques (ctid) que varios procesos cargan a la vez en el servidor,
+        cada uno en su propia transacción. Si algún rango falla, se eliminan los ya confirmados.
+        Devuelve None si la fuente no es una tabla (p. ej. una vista) y no puede repartirse.
+        Las características y cada rango se confirman por separado: hasta que termina la carga, otras
+        conexiones pueden ver los puntos y valores de una fuente incompleta. Los modelos no la leen así,
+        ya que sus datos se obtienen de los vectores, que se crean después en la transacción de la carga.
+        """
+        block_count = self.table_loader.get_block_count(source)
+        if block_count is None:
+            return None
+
+        columns = self.table_loader.describe_columns(source, target_column)
+        if not columns:
+            return [], []
+
+        features = [
+            Feature(id_source=source_id, name=name, is_target=name == target_column)
+            for name, _ in columns
+        ]
+        self.feature_repo.add_features(features)
+        # Los procesos trabajan con otras conexiones: las características deben estar confirmadas antes
+        self.database.connection.commit()
+
+        workers = self.ingest_settings["parallel_workers"]
+        # Varios rangos por proceso para repartir mejor la carga si los bloques no están igual de llenos
+        step = max(1, -(-block_count // (workers * 4)))
+        ranges = [(start, min(start + step, block_count)) for start in range(0, block_count, step)]
+
+        target_values = {}
+        try:
+            # Todos los procesos leen la tabla con la instantánea de esta transacción, que sigue abierta
+            # hasta que terminan: así cada rango sabe cuántas filas le preceden y los puntos se numeran
+            # de forma global, igual que en los otros modos
+            snapshot = self.table_loader.export_snapshot()
+            counts = self.table_loader.count_block_ranges(source, step)
+            offsets = np.cumsum([0] + [counts.get(index, 0) for index in range(len(ranges) - 1)])
+
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [
+                    pool.submit(ingest_block_range, source_id, source, columns, [f.id for f in features],
+                                target_column, blocks, int(offsets[index]), snapshot,
+                                self.ingest_settings["defer_constraints"])
+                    for index, blocks in enumerate(ranges)
+                ]
+                try:
+                    for future in futures:
+                        _, values = future.result()
+                        target_values.update(dict.fromkeys(values))
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            # Se cierra la transacción de la instantánea para ver las filas confirmadas por los procesos
+            self.database.connection.commit()
+        except Exception:
+            # La fuente solo queda lista si todos los rangos se confirman
+            self.database.connection.rollback()
+            with UnitOfWork(self.database.connection):
+                self.point_vector_repo.delete_by_source(source_id)
+                self.point_value_repo.delete_by_source(source_id)
+                self.point_repo.delete_by_source(source_id)
+                self.feature_repo.delete_by_source(source_id)
+            raise
+
+        return features, list(target_values)
+
+    def _ingest_stream(self, source_id: int, source: str, target_column: str, features: Optional[List[Feature]],
+                       bounds, offset: int, limit: Optional[int],
+                       sampling: Optional[dict]) -> Tuple[List[Feature], list]:
+        """Lee la tabla por bloques y los carga con COPY (los datos pasan por el cliente)."""
+        target_values = {}
+
+        # Cada bloque se escribe antes de leer el siguiente: la memoria queda acotada por `chunk_size`
+        for df in self.table_loader.iter_chunks(
+            source,
+            target_column,
+            chunk_size=self.ingest_settings["chunk_size"],
+            limit=limit,
+            columns=[f.name for f in features] if features else None,
+            bounds=bounds,
+            sampling=sampling
+        ):
+            if features is None:
+                # Crear todas las características en bloque; los ids se devuelven en el orden de las columnas
+                features = [
+                    Feature(id_source=source_id, name=column, is_target=column == target_column)
+                    for column in df.columns
+                ]
+                self.feature_repo.add_features(features)
+
+            self._ingest_chunk(source_id, df, features, offset)
+
+            if target_column:
+                # Conservar el orden de aparición de las clases entre bloques
+                target_values.update(dict.fromkeys(df[target_column].dropna().unique()))
+
+        return features or [], list(target_values)
+
+    def _ingest_in_database(self, source_id: int, source: str, target_column: str, features: Optional[List[Feature]],
+                            bounds, offset: int, limit: Optional[int],
+                            sampling: Optional[dict]) -> Tuple[List[Feature], list]:
+        """
+        Carga la fuente íntegramente en el servidor: las columnas se obtienen del catálogo y
+        puntos y valores se insertan con una única sentencia INSERT ... SELECT, sin transferir filas.
+        """
+        # En una actualización se conservan las columnas de la fuente, en el orden de sus características
+        columns = self.table_loader.describe_columns(
+            source, target_column, [f.name for f in features] if features else None
+        )
+
+        if features is None:
+            if not columns:
+                return [], []
+            features = [
+                Feature(id_source=source_id, name=name, is_target=name == target_column)
+                for name, _ in columns
+            ]
+            self.feature_repo.add_features(features)
+
+        select = self.table_loader.build_select(
+            source, columns, limit=limit, bounds=bounds, sampling=sampling
+        )
+        self.point_value_repo.add_from_query(
+            source_id,
+            select,
+            [(feature.id, name, kind in ('numeric', 'boolean')) for feature, (name, kind) in zip(features, columns)],
+            name_offset=offset,
+            defer_constraints=self.ingest_settings["defer_constraints"]
+        )
+
+        # Solo viajan al cliente las clases distintas de la variable objetivo
+        target_values = self.table_loader.fetch_distinct(select, target_column) if target_column else []
+        return features, target_values
+
+    def _ingest_chunk(self, source_id: int, df, features: List[Feature], offset: int = 0) -> None:
+        """Crea los puntos de un bloque y carga sus valores en bloque (COPY)."""
+        # El índice del bloque es la posición de la fila en la tabla origen (o en el rango leído)
+        points = [Point(id_source=source_id, name=f"point_{offset + index + 1}") for index in df.index]
+        point_ids = self.point_repo.add_points(points, batch_size=self.ingest_settings["batch_size"])
+
+        point_values = self._melt_values(source_id, df, point_ids, features)
+        self.point_value_repo.add_frame(
+            point_values,
+            batch_size=self.ingest_settings["batch_size"],
+            defer_constraints=self.ingest_settings["defer_constraints"]
+        )
+
+    @staticmethod
+    def _melt_values(source_id: int, df: pd.DataFrame, point_ids: List[int], features: List[Feature]) -> pd.DataFrame:
+        """
+        Despivota el bloque a formato EAV de forma vectorizada: una fila por (punto, característica)
+        con las columnas de grafana_ml_model_point_value, sin crear un objeto por celda.
+        """
+        n_rows = len(df)
+        numeric_blocks = []
+        string_blocks = []
+
+        for feature in features:
+            column = df[feature.name]
+
+            if pd.api.types.is_numeric_dtype(column):
+                numeric_blocks.append(column.to_numpy(dtype=float))
+                string_blocks.append(np.full(n_rows, None, dtype=object))
+            else:
+                # Columna no numérica (p. ej. objetivo categórico): los números van a numeric_value,
+                # las cadenas a string_value y cualquier otro tipo se descarta
+                values = column.to_numpy(dtype=object)
+                is_number = np.array([isinstance(v, numbers.Number) for v in values], dtype=bool)
+                is_string = np.array([isinstance(v, str) for v in values], dtype=bool)
+                numeric_blocks.append(np.where(is_number, values, np.nan).astype(float))
+                string_blocks.append(np.where(is_string, values, None))
+
+        return pd.DataFrame({
+            'id_source': np.full(n_rows * len(features), source_id, dtype=np.int64),
+            'id_point': np.tile(np.asarray(point_ids, dtype=np.int64), len(features)),
+            'id_feature': np.repeat(np.asarray([f.id for f in features], dtype=np.int64), n_rows),
+            'numeric_value': np.concatenate(numeric_blocks) if numeric_blocks else np.empty(0),
+            'string_value': np.concatenate(string_blocks) if string_blocks else np.empty(0, dtype=object),
+        })
+
+    def _save_prediction_values(self, source_id: int, target_values) -> None:
+        """Guarda en bloque las clases de la variable objetivo (categórica o numérica binaria)."""
+        predictions = []
+
+        if all(isinstance(v, str) for v in target_values):
+            # Caso categórico
+            predictions = [PredictionValue(id_source=source_id, class_name=class_value) for class_value in target_values]
+
+        elif all(isinstance(v, (int, float, np.integer, np.floating)) for v in target_values):
+            # Caso binario (solo 2 valores distintos)
+            bin_classes = set(target_values)
+            if len(bin_classes) == 2:
+                predictions = [
+                    PredictionValue(id_source=source_id, class_name=str(class_value))
+                    for class_value in sorted(bin_classes)
+                ]
+
+        if predictions:
+            self.prediction_value_repo.add_prediction_values(predictions)
+
+    def delete(self, source_id: int) -> Optional[int]:
+        """
+        Elimina la fuente. Si varias tareas de creación vigentes la comparten, solo se libera la más
+        reciente (queda como eliminada) y se conservan los datos para las demás; en ese caso se
+        devuelve el id de la tarea liberada. Si era la última, se eliminan sus datos y se devuelve None.
+        """
         # Verificar existencia antes de iniciar la transacción
         if not self.source_repo.get(source_id):
             raise ValueError(f"No existe la fuente con id {source_id}.")
-    
+
+        with UnitOfWork(self.database.connection):
+            if self.source_repo.count_create_tasks(source_id) > 1:
+                return self.source_repo.release_create_task(source_id)
+
+        self._remove(source_id)
+        return None
+
+    def _remove(self, source_id: int) -> None:
+        """Elimina la fuente con todos sus datos y su partición."""
         with UnitOfWork(self.database.connection):
             self.prediction_value_repo.delete_by_source(source_id)
+            self.point_vector_repo.delete_by_source(source_id)
             self.point_value_repo.delete_by_source(source_id)
             self.point_repo.delete_by_source(source_id)
             self.feature_repo.delete_by_source(source_id)
             self.source_repo.delete(source_id)
+
+        # La partición, ya vacía, se elimina tras confirmar el borrado para no bloquear la tabla durante él,
+        # junto con las que no pudieron eliminarse en borrados anteriores
+        try:
+            self.point_value_repo.drop_orphan_partitions()
+        except LockNotAvailable:
+            logging.warning(f"No se pudo eliminar la partición vacía de la fuente {source_id}: tabla bloqueada. "
+                            f"Se reintentará en el siguiente borrado.")
+
+        self.matrix_cache.invalidate(source_id)
+        SourceDataCache.invalidate(source_id)
@@ -1,54 +1,321 @@
+import uuid
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
 import pandas as pd
 from psycopg2 import errors
-from psycopg2.sql import SQL, Identifier, Literal
+from psycopg2.sql import SQL, Composed, Identifier, Literal
 
 from ...database.database_connection import DatabaseConnection
 
 
 class TableLoader:
-    
-    def load_dataframe(self, source: str, target_column: str, limit: int = 45000) -> pd.DataFrame:
-        """Carga hasta `limit` filas desde una tabla especificada con 'esquema.tabla'.
-        Convierte columnas booleanas a 0/1 y mantiene solo columnas numéricas,
-        excepto la variable objetivo (si se especifica), que puede ser categórica o numérica.
+    NUMERIC_TYPES = {'smallint', 'integer', 'bigint', 'real', 'double precision', 'numeric'}
+    TEXT_TYPES = {'character varying', 'character', 'text'}
+
+    def iter_chunks(self, source: str, target_column: str, chunk_size: int = 50000,
+                    limit: Optional[int] = None, columns: Optional[List[str]] = None,
+                    bounds: Optional[Tuple[str, Optional[str], Optional[str]]] = None,
+                    sampling: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        """Recorre la tabla con un cursor del lado del servidor y devuelve bloques de `chunk_size` filas.
+        Las columnas se eligen consultando el catálogo (solo numéricas, booleanas y objetivo), y la
+        conversión de booleanos a 0/1 y el descarte de filas con nulos se hacen en la propia consulta,
+        por lo que no se transfieren columnas ni filas que luego se descartarían.
+        Cada bloque conserva como índice la posición de la fila en la tabla, de modo que la memoria
+        usada queda acotada por el tamaño del bloque y no por el de la tabla.
+        Si se indica `columns`, se usan esas columnas (y en ese orden) en lugar de deducirlas.
+        Si se indica `bounds` (columna, desde, hasta), solo se leen las filas con la columna en
+        el rango (desde, hasta], ordenadas por ella. Si se indica `sampling`, se lee solo la muestra.
+        El cursor vive en la transacción actual: no debe hacerse commit hasta consumir el iterador.
         """
+        schema, table = self._split_source(source)
 
-        if '.' not in source or source.count('.') != 1:
-            raise ValueError("Debe indicarse el nombre como 'esquema.tabla'")
+        described = self.describe_columns(source, target_column, columns)
+        if not described:
+            return
 
-        schema, table = source.split('.')
+        query = self.build_select(source, described, limit=limit, bounds=bounds, sampling=sampling)
+        names = ['rn'] + [name for name, _ in described]
 
-        query = SQL("SELECT * FROM {}.{} LIMIT {}").format(
-            Identifier(schema),
-            Identifier(table),
-            Literal(limit)
-        )
+        db = DatabaseConnection()
+        cursor = db.connection.cursor(name=f"table_loader_{uuid.uuid4().hex}")
+        cursor.itersize = chunk_size
 
         try:
-            db = DatabaseConnection()
-            with db.connection.cursor() as cursor:
-                cursor.execute(query)
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                df = pd.DataFrame(rows, columns=columns)
+            cursor.execute(query)
 
-                # Convertir booleanos a 0/1
-                bool_cols = df.select_dtypes(include=['bool']).columns
-                df[bool_cols] = df[bool_cols].astype(int)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
 
-                # Seleccionar columnas numéricas
-                df_numeric = df.select_dtypes(include=['number'])
+                df = pd.DataFrame(rows, columns=names)
+                df.index = pd.Index(df.pop('rn').to_numpy() - 1)
 
-                # Si se indica variable objetivo y existe, se añade (aunque no sea numérica)
-                if target_column:
-                    if target_column not in df.columns:
-                        raise ValueError(f"La columna objetivo '{target_column}' no existe en la tabla.")
-                    if target_column not in df_numeric.columns:
-                        df_numeric[target_column] = df[target_column]
-
-                return df_numeric.dropna()
+                yield self._convert_chunk(df, described)
 
         except errors.UndefinedTable:
             raise RuntimeError(f"La tabla '{schema}.{table}' no existe.")
         except Exception as e:
-            raise RuntimeError(f"No se pudo leer la tabla {schema}.{table}: {e}")
\ No newline at end of file
+            raise RuntimeError(f"No se pudo leer la tabla {schema}.{table}: {e}")
+        finally:
+            cursor.close()
+
+    def describe_columns(self, source: str, target_column: str,
+                         columns: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """Consulta el catálogo y devuelve las columnas útiles de la tabla como (nombre, tipo),
+        con tipo 'numeric', 'boolean', 'text' u 'other'. Solo se incluyen columnas numéricas
+        y booleanas, más la variable objetivo (aunque no sea numérica), en el orden de la tabla.
+        Si se indica `columns`, se devuelven exactamente esas columnas y en ese orden.
+        """
+        schema, table = self._split_source(source)
+
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                ORDER BY ordinal_position
+            """, (schema, table))
+            rows = cursor.fetchall()
+
+        if not rows:
+            raise RuntimeError(f"La tabla '{schema}.{table}' no existe.")
+
+        if columns is not None:
+            kinds = {name: self._kind(data_type) for name, data_type in rows}
+            missing = [name for name in columns if name not in kinds]
+            if missing:
+                raise ValueError(f"Faltan columnas en la tabla: {', '.join(missing)}.")
+            return [(name, kinds[name]) for name in columns]
+
+        selected = []
+        target = None
+        for name, data_type in rows:
+            kind = self._kind(data_type)
+            if name == target_column and kind not in ('numeric', 'boolean'):
+                target = (name, kind)
+            elif kind in ('numeric', 'boolean'):
+                selected.append((name, kind))
+
+        # Si se indica variable objetivo y existe, se añade (aunque no sea numérica)
+        if target_column:
+            if target_column not in {name for name, _ in rows}:
+                raise ValueError(f"La columna objetivo '{target_column}' no existe en la tabla.")
+            if target is not None:
+                selected.append(target)
+
+        return selected
+
+    @classmethod
+    def _kind(cls, data_type: str) -> str:
+        if data_type in cls.NUMERIC_TYPES:
+            return 'numeric'
+        if data_type == 'boolean':
+            return 'boolean'
+        if data_type in cls.TEXT_TYPES:
+            return 'text'
+        return 'other'
+
+    def build_select(self, source: str, columns: List[Tuple[str, str]], limit: Optional[int] = None,
+                     bounds: Optional[Tuple[str, Optional[str], Optional[str]]] = None,
+                     sampling: Optional[dict] = None, blocks: Optional[Tuple[int, int]] = None) -> Composed:
+        """Construye la consulta que lee solo `columns` de la tabla, descartando filas con nulos.
+        Devuelve además `rn`, la posición de la fila en la tabla (antes de filtrar), que da nombre a los puntos.
+        Los booleanos se convierten a 0/1 en el propio servidor.
+        Con `bounds` se limita al rango de la marca de agua, numerando las filas en su orden,
+        y con `sampling` a la muestra indicada. Con `blocks` (desde, hasta) se leen solo las filas
+        almacenadas en ese rango de bloques de la tabla (por ctid), para repartir la carga en paralelo.
+        """
+        schema, table = self._split_source(source)
+
+        source_table = self._relation(schema, table, sampling)
+        if blocks:
+            source_table = SQL("(SELECT * FROM {} WHERE ctid >= {}::tid AND ctid < {}::tid) AS t").format(
+                source_table, Literal(f"({blocks[0]},0)"), Literal(f"({blocks[1]},0)"))
+        order = SQL("")
+        if bounds:
+            source_table = SQL("(SELECT * FROM {} WHERE {}) AS t").format(source_table, self._bounds_filter(bounds))
+            order = SQL("ORDER BY {}").format(Identifier(bounds[0]))
+        if limit:
+            source_table = SQL("(SELECT * FROM {} {} LIMIT {}) AS t").format(source_table, order, Literal(limit))
+
+        expressions = []
+        for name, kind in columns:
+            if kind == 'boolean':
+                expressions.append(SQL("{0}::integer AS {0}").format(Identifier(name)))
+            else:
+                expressions.append(Identifier(name))
+
+        not_null = SQL(" AND ").join(SQL("{} IS NOT NULL").format(Identifier(name)) for name, _ in columns)
+
+        return SQL("""
+            SELECT rn, {expressions}
+            FROM (SELECT row_number() OVER ({order}) AS rn, * FROM {source_table}) AS src
+            WHERE {not_null}
+        """).format(
+            expressions=SQL(", ").join(expressions),
+            order=order,
+            source_table=source_table,
+            not_null=not_null
+        )
+
+    def fetch_distinct(self, select: Composed, column: str) -> list:
+        """Valores distintos de `column` en la consulta `select`, en orden de primera aparición."""
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute(SQL("""
+                SELECT {column}
+                FROM ({select}) AS s
+                GROUP BY {column}
+                ORDER BY min(rn)
+            """).format(column=Identifier(column), select=select))
+            # Los valores numeric llegan como Decimal: se tratan como números reales
+            return [float(row[0]) if isinstance(row[0], Decimal) else row[0] for row in cursor.fetchall()]
+
+    def fingerprint(self, source: str) -> Tuple[int, str, str]:
+        """
+        Huella del contenido de la tabla calculada en el servidor: número de filas, hash de la lista
+        de columnas (nombre y tipo) y hash de las filas. El hash de filas suma los hash de cada fila,
+        de modo que no depende del orden físico y no requiere ordenar la tabla.
+        """
+        schema, table = self._split_source(source)
+
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT md5(string_agg(column_name || ':' || data_type, ',' ORDER BY ordinal_position))
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+            """, (schema, table))
+            columns_hash = cursor.fetchone()[0]
+            if columns_hash is None:
+                raise RuntimeError(f"La tabla '{schema}.{table}' no existe.")
+
+            cursor.execute(SQL("""
+                SELECT COUNT(*), COALESCE(SUM(('x' || substr(md5(t::text), 1, 16))::bit(64)::bigint::numeric), 0)::text
+                FROM {}.{} AS t
+            """).format(Identifier(schema), Identifier(table)))
+            row_count, rows_hash = cursor.fetchone()
+
+        return row_count, columns_hash, rows_hash
+
+    def get_block_count(self, source: str) -> Optional[int]:
+        """Número de bloques de la tabla, o None si no es una tabla con almacenamiento propio (p. ej. una vista)."""
+        schema, table = self._split_source(source)
+
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relkind, pg_relation_size(c.oid) / current_setting('block_size')::integer
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = %s
+            """, (schema, table))
+            row = cursor.fetchone()
+
+        if row is None or row[0] not in ('r', 'm'):
+            return None
+        return row[1]
+
+    def count_block_ranges(self, source: str, step: int) -> Dict[int, int]:
+        """
+        Número de filas de la tabla en cada rango de `step` bloques, por índice de rango. Los rangos
+        sin filas no aparecen. Sirve para numerar los puntos de forma global al repartir la carga.
+        """
+        schema, table = self._split_source(source)
+
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute(SQL("""
+                SELECT ((ctid::text::point)[0]::bigint / {}) AS block_range, COUNT(*)
+                FROM {}.{}
+                GROUP BY block_range
+            """).format(Literal(step), Identifier(schema), Identifier(table)))
+            return dict(cursor.fetchall())
+
+    def export_snapshot(self) -> str:
+        """
+        Inicia en la conexión actual una transacción REPEATABLE READ y exporta su instantánea, para que
+        otros procesos lean la tabla en el mismo estado. La transacción debe seguir abierta mientras la usen.
+        """
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SELECT pg_export_snapshot()")
+            return cursor.fetchone()[0]
+
+    def import_snapshot(self, snapshot: str) -> None:
+        """Hace que la transacción que empieza en la conexión actual lea con la instantánea exportada `snapshot`."""
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+
+    def get_watermark(self, source: str, column: str) -> Optional[str]:
+        """Valor máximo actual de la columna de marca de agua, como texto (None si la tabla está vacía)."""
+        schema, table = self._split_source(source)
+
+        db = DatabaseConnection()
+        with db.connection.cursor() as cursor:
+            try:
+                cursor.execute(SQL("SELECT MAX({})::text FROM {}.{}").format(
+                    Identifier(column), Identifier(schema), Identifier(table)))
+            except errors.UndefinedColumn:
+                raise ValueError(f"La columna de marca de agua '{column}' no existe en la tabla.")
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _relation(schema: str, table: str, sampling: Optional[dict] = None) -> Composed:
+        """
+        Tabla a leer, opcionalmente muestreada en el servidor:
+        - 'bernoulli' / 'system': TABLESAMPLE con el porcentaje `fraction` y REPEATABLE(seed).
+        - 'hash': las `size` filas con menor hash del contenido de la fila y la semilla, por lo que la
+          muestra es uniforme y se repite con la misma semilla. No es un muestreo de una pasada: se
+          calcula el hash de toda la tabla, y el coste depende de su tamaño y no de `size`.
+        """
+        relation = SQL("{}.{}").format(Identifier(schema), Identifier(table))
+        if not sampling:
+            return relation
+
+        if sampling["method"] in ("bernoulli", "system"):
+            return SQL("{} AS t TABLESAMPLE {} ({}) REPEATABLE ({})").format(
+                relation,
+                SQL(sampling["method"].upper()),
+                Literal(sampling["fraction"] * 100),
+                Literal(sampling["seed"])
+            )
+
+        return SQL("(SELECT * FROM {} AS t ORDER BY md5(t::text || {}) LIMIT {}) AS t").format(
+            relation,
+            Literal(str(sampling["seed"])),
+            Literal(sampling["size"])
+        )
+
+    @staticmethod
+    def _bounds_filter(bounds: Tuple[str, Optional[str], Optional[str]]) -> Composed:
+        """Condición `columna > desde AND columna <= hasta`; los valores se comparan con el tipo de la columna."""
+        column, lower, upper = bounds
+        conditions = [SQL("{} IS NOT NULL").format(Identifier(column))]
+        if lower is not None:
+            conditions.append(SQL("{} > {}").format(Identifier(column), Literal(lower)))
+        if upper is not None:
+            conditions.append(SQL("{} <= {}").format(Identifier(column), Literal(upper)))
+        return SQL(" AND ").join(conditions)
+
+    @staticmethod
+    def _split_source(source: str) -> Tuple[str, str]:
+        if '.' not in source or source.count('.') != 1:
+            raise ValueError("Debe indicarse el nombre como 'esquema.tabla'")
+        schema, table = source.split('.')
+        return schema, table
+
+    @staticmethod
+    def _convert_chunk(df: pd.DataFrame, columns: List[Tuple[str, str]]) -> pd.DataFrame:
+        """Ajusta los tipos del bloque: las columnas numeric llegan como Decimal y se pasan a float."""
+        for column, kind in columns:
+            if kind == 'numeric' and not pd.api.types.is_numeric_dtype(df[column]):
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+
+        return df
@@ -24,6 +24,15 @@ class FeatureRepository(Repository[Feature]):
             cursor.execute("SELECT id_source, name, is_target, id FROM grafana_ml_model_feature")
             return [Feature(*row) for row in cursor.fetchall()]
 
+    def get_by_source(self, source_id: int) -> List[Feature]:
+        """Características de una fuente en el orden en que se crearon."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                "SELECT id_source, name, is_target, id FROM grafana_ml_model_feature WHERE id_source = %s ORDER BY id",
+                (source_id,)
+            )
+            return [Feature(*row) for row in cursor.fetchall()]
+
     def add(self, item: Feature) -> None:
         """Agrega un nuevo Feature y actualiza su id."""
         with self.connect() as cursor:
@@ -33,6 +42,23 @@ class FeatureRepository(Repository[Feature]):
             )
             item.id = cursor.fetchone()[0]
 
+    def add_features(self, items: List[Feature]) -> List[int]:
+        """
+        Inserta en bloque todas las características dentro de la transacción en curso.
+        Los ids se asignan en el mismo orden que `items`.
+        """
+        with self.connect(autocommit=False) as cursor:
+            ids = self.reserve_ids(cursor, "grafana_ml_model_feature", "id", len(items))
+            for item, id in zip(items, ids):
+                item.id = id
+            self.copy_rows(
+                cursor,
+                "grafana_ml_model_feature",
+                ["id", "id_source", "name", "is_target"],
+                ((item.id, item.id_source, item.name, item.is_target) for item in items)
+            )
+        return ids
+
     def update(self, id: int, **kwargs: object) -> None:
         allowed = ["id_source", "name", "is_target"]
         fields = [f"{k} = %s" for k in allowed if k in kwargs]
@@ -26,6 +26,30 @@ class PointRepository(Repository[Point]):
             cursor.execute("SELECT id_source, name, id FROM grafana_ml_model_point")
             return [Point(*row) for row in cursor.fetchall()]
 
+    def count_by_source(self, source_id: int) -> int:
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute("SELECT COUNT(*) FROM grafana_ml_model_point WHERE id_source = %s", (source_id,))
+            return cursor.fetchone()[0]
+
+    def get_last_id(self, source_id: int) -> int:
+        """Mayor id de los puntos de una fuente (0 si no tiene puntos): los puntos nuevos tendrán ids mayores."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM grafana_ml_model_point WHERE id_source = %s", (source_id,))
+            return cursor.fetchone()[0]
+
+    def get_last_number(self, source_id: int) -> int:
+        """Mayor número N de los puntos 'point_N' de una fuente (0 si no tiene puntos)."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                """
+                SELECT COALESCE(MAX(substring(name FROM '^point_([0-9]+)$')::bigint), 0)
+                FROM grafana_ml_model_point
+                WHERE id_source = %s
+                """,
+                (source_id,)
+            )
+            return cursor.fetchone()[0]
+
     def add(self, item: Point) -> None:
         """Agrega un nuevo Point y actualiza su id."""
         with self.connect() as cursor:
@@ -34,6 +58,24 @@ class PointRepository(Repository[Point]):
                 (item.id_source, item.name)
             )
             item.id = cursor.fetchone()[0]
+
+    def add_points(self, items: List[Point], batch_size: int = 100000) -> List[int]:
+        """
+        Inserta en bloque todos los puntos dentro de la transacción en curso.
+        Los ids se reservan de la secuencia en una sola consulta y se asignan en el mismo orden que `items`.
+        """
+        with self.connect(autocommit=False) as cursor:
+            ids = self.reserve_ids(cursor, "grafana_ml_model_point", "id", len(items))
+            for item, id in zip(items, ids):
+                item.id = id
+            self.copy_rows(
+                cursor,
+                "grafana_ml_model_point",
+                ["id", "id_source", "name"],
+                ((item.id, item.id_source, item.name) for item in items),
+                batch_size
+            )
+        return ids
             
     def update(self, id: int, **kwargs: object) -> None:
         allowed = ["id_source", "name"]
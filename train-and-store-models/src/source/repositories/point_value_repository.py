@@ -1,4 +1,7 @@
-from typing import List
+from typing import Iterable, List, Tuple
+
+import pandas as pd
+from psycopg2.sql import SQL, Composed, Identifier, Literal
 
 from ...crc.repositories.repository import Repository
 from ..entities.point_value_entity import PointValue
@@ -33,6 +36,82 @@ class PointValueRepository(Repository[PointValue]):
                 (item.id_source, item.id_point, item.id_feature, item.numeric_value, item.string_value)
             )
 
+    def add_values(self, items: Iterable[PointValue], batch_size: int = 100000, defer_constraints: bool = False) -> int:
+        """
+        Carga masiva de valores mediante COPY dentro de la transacción en curso.
+        Si `defer_constraints` es True, la verificación de las claves foráneas se aplaza hasta el commit.
+        """
+        with self.connect(autocommit=False) as cursor:
+            if defer_constraints:
+                cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+            return self.copy_rows(
+                cursor,
+                "grafana_ml_model_point_value",
+                ["id_source", "id_point", "id_feature", "numeric_value", "string_value"],
+                ((i.id_source, i.id_point, i.id_feature, i.numeric_value, i.string_value) for i in items),
+                batch_size
+            )
+
+    def add_frame(self, frame: pd.DataFrame, batch_size: int = 100000, defer_constraints: bool = False) -> int:
+        """
+        Carga masiva a partir de un DataFrame columnar (id_source, id_point, id_feature,
+        numeric_value, string_value) sin crear un PointValue por celda.
+        """
+        with self.connect(autocommit=False) as cursor:
+            if defer_constraints:
+                cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+            return self.copy_frame(
+                cursor,
+                "grafana_ml_model_point_value",
+                frame[["id_source", "id_point", "id_feature", "numeric_value", "string_value"]],
+                batch_size
+            )
+
+    def add_from_query(self, id_source: int, select: Composed, features: List[Tuple[int, str, bool]],
+                       name_offset: int = 0, defer_constraints: bool = False) -> int:
+        """
+        Carga la fuente sin sacar los datos del servidor: una sola sentencia crea los puntos
+        (uno por fila de `select`, llamados 'point_<name_offset + rn>') y despivota sus columnas con
+        CROSS JOIN LATERAL (VALUES ...). `select` debe devolver `rn` y las columnas de `features`,
+        dadas como (id_feature, columna, es_numerica). Devuelve el número de valores insertados.
+        """
+        values = []
+        for id_feature, column, is_numeric in features:
+            if is_numeric:
+                values.append(SQL("({}, src.{}::double precision, NULL::varchar)").format(
+                    Literal(id_feature), Identifier(column)))
+            else:
+                values.append(SQL("({}, NULL::double precision, src.{}::varchar)").format(
+                    Literal(id_feature), Identifier(column)))
+
+        query = SQL("""
+            WITH src AS (
+                SELECT nextval(pg_get_serial_sequence('grafana_ml_model_point', 'id')) AS id_point, s.*
+                FROM ({select}) AS s
+            ),
+            points AS (
+                INSERT INTO grafana_ml_model_point (id, id_source, name)
+                SELECT id_point, {id_source}, 'point_' || ({name_offset} + rn)
+                FROM src
+            )
+            INSERT INTO grafana_ml_model_point_value (id_source, id_point, id_feature, numeric_value, string_value)
+            SELECT {id_source}, src.id_point, v.id_feature, v.numeric_value, v.string_value
+            FROM src
+            CROSS JOIN LATERAL (VALUES {values}) AS v(id_feature, numeric_value, string_value)
+        """).format(
+            select=select,
+            id_source=Literal(id_source),
+            name_offset=Literal(name_offset),
+            values=SQL(", ").join(values)
+        )
+
+        with self.connect(autocommit=False) as cursor:
+            # Los valores referencian puntos creados en la misma sentencia: la verificación se aplaza
+            if defer_constraints:
+                cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+            cursor.execute(query)
+            return cursor.rowcount
+
     def update(self, id_point: int, id_feature: int, **kwargs: object) -> None:
         allowed = ["id_source", "id_point", "id_feature", "numeric_value", "string_value"]
         fields = [f"{k} = %s" for k in allowed if k in kwargs]
@@ -53,9 +132,90 @@ class PointValueRepository(Repository[PointValue]):
                            (id_point, id_feature))
             
     def delete_by_source(self, source_id: int) -> None:
-        """Elimina todos los valores de punto asociados a un id_source."""
+        """
+        Elimina todos los valores de punto asociados a un id_source. Si la fuente tiene partición se vacía
+        con TRUNCATE; si no llegó a crearse (una carga fallida), no hay valores que borrar fuera de ella.
+        """
         with self.connect(autocommit=False) as cursor:
-            cursor.execute("DELETE FROM grafana_ml_model_point_value WHERE id_source = %s", (source_id,))
-                
+            if self._partition_exists(cursor, source_id):
+                cursor.execute(SQL("TRUNCATE {}").format(Identifier(self._partition_name(source_id))))
+            else:
+                cursor.execute("DELETE FROM grafana_ml_model_point_value WHERE id_source = %s", (source_id,))
+
+    def create_partition(self, source_id: int) -> None:
+        """
+        Crea la partición de la fuente. Debe confirmarse antes de cargar sus valores: la carga
+        en paralelo escribe desde otras conexiones. La tabla se crea aparte y se adjunta con
+        ATTACH PARTITION, que bloquea la tabla principal en modo SHARE UPDATE EXCLUSIVE y no impide
+        leer ni escribir otras fuentes (CREATE TABLE ... PARTITION OF la bloquearía por completo).
+        """
+        partition = Identifier(self._partition_name(source_id))
+        with self.connect() as cursor:
+            if self._partition_attached(cursor, source_id):
+                return
+            cursor.execute(SQL("CREATE TABLE IF NOT EXISTS {} (LIKE grafana_ml_model_point_value)").format(partition))
+            cursor.execute(
+                SQL("ALTER TABLE grafana_ml_model_point_value ATTACH PARTITION {} FOR VALUES IN ({})").format(
+                    partition, Literal(source_id)
+                )
+            )
+
+    def drop_orphan_partitions(self) -> None:
+        """
+        Elimina las particiones de las fuentes ya borradas: la de la fuente que se acaba de borrar (sus
+        valores se vacían con `delete_by_source` dentro de la transacción del borrado) y las que quedaran
+        de borrados anteriores interrumpidos. Se ejecuta fuera de esa transacción, en modo autocommit:
+        cada partición se separa con DETACH PARTITION CONCURRENTLY, que no bloquea la tabla principal
+        (o se completa con FINALIZE si una separación anterior quedó a medias), y después se elimina la
+        tabla ya separada. Si la tabla principal está ocupada más de `lock_timeout`, se lanza
+        LockNotAvailable y las particiones pendientes se eliminan en el siguiente borrado.
+        """
+        connection = self.db.connection
+        autocommit = connection.autocommit
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT c.relname, i.inhrelid IS NOT NULL, COALESCE(i.inhdetachpending, false)
+                    FROM pg_class c
+                    LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+                    WHERE c.relnamespace = 'public'::regnamespace
+                      AND c.relkind = 'r'
+                      AND c.relname ~ '^grafana_ml_model_point_value_[0-9]+$'
+                      AND NOT EXISTS (
+                          SELECT 1 FROM grafana_ml_model_source s
+                          WHERE s.id = substring(c.relname FROM '[0-9]+$')::integer
+                      )
+                """)
+                orphans = cursor.fetchall()
+
+                cursor.execute("SET lock_timeout = '30s'")
+                try:
+                    for name, attached, detach_pending in orphans:
+                        partition = Identifier(name)
+                        if attached:
+                            cursor.execute(
+                                SQL("ALTER TABLE grafana_ml_model_point_value DETACH PARTITION {} {}").format(
+                                    partition, SQL("FINALIZE" if detach_pending else "CONCURRENTLY")
+                                )
+                            )
+                        cursor.execute(SQL("DROP TABLE {}").format(partition))
+                finally:
+                    cursor.execute("RESET lock_timeout")
+        finally:
+            connection.autocommit = autocommit
+
+    @staticmethod
+    def _partition_name(source_id: int) -> str:
+        return f"grafana_ml_model_point_value_{int(source_id)}"
+
+    def _partition_exists(self, cursor, source_id: int) -> bool:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (self._partition_name(source_id),))
+        return cursor.fetchone()[0]
 
-    
\ No newline at end of file
+    def _partition_attached(self, cursor, source_id: int) -> bool:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s))",
+            (self._partition_name(source_id),)
+        )
+        return cursor.fetchone()[0]
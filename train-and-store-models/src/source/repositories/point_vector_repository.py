@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+from ...crc.repositories.repository import Repository
+from ..entities.point_vector_entity import PointVector
+
+
+class PointVectorRepository(Repository[PointVector]):
+    """
+    Representación densa de una fuente: una fila por punto con el array de valores numéricos
+    de todas sus características (ordenadas por id, NULL si el valor no es numérico) y el valor
+    de la variable objetivo. Se genera a partir de grafana_ml_model_point_value al cargar la fuente.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+
+    def get(self, id_point: int) -> PointVector:
+        with self.connect() as cursor:
+            cursor.execute(
+                "SELECT id_source, id_point, numeric_values, target_numeric, target_string FROM grafana_ml_model_point_vector WHERE id_point = %s",
+                (id_point,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError(f"No existe vector para el punto con id {id_point}")
+            return PointVector(*row)
+
+    def get_all(self) -> List[PointVector]:
+        with self.connect() as cursor:
+            cursor.execute(
+                "SELECT id_source, id_point, numeric_values, target_numeric, target_string FROM grafana_ml_model_point_vector"
+            )
+            return [PointVector(*row) for row in cursor.fetchall()]
+
+    def add(self, item: PointVector) -> None:
+        with self.connect() as cursor:
+            cursor.execute(
+                "INSERT INTO grafana_ml_model_point_vector (id_source, id_point, numeric_values, target_numeric, target_string) VALUES (%s, %s, %s, %s, %s)",
+                (item.id_source, item.id_point, item.numeric_values, item.target_numeric, item.target_string)
+            )
+
+    def add_from_values(self, source_id: int, after_point: Optional[int] = None) -> int:
+        """
+        Genera en el servidor los vectores de los puntos de la fuente que aún no lo tienen,
+        dentro de la transacción en curso. Devuelve el número de vectores creados.
+        En una actualización, `after_point` es el mayor id de punto anterior a la carga: solo se
+        recorren los valores de los puntos nuevos (por la clave primaria), no los de toda la fuente.
+        """
+        after_filter = "AND pv.id_point > %(after_point)s" if after_point is not None else ""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(f"""
+                INSERT INTO grafana_ml_model_point_vector (id_source, id_point, numeric_values, target_numeric, target_string)
+                SELECT
+                    pv.id_source,
+                    pv.id_point,
+                    array_agg(pv.numeric_value ORDER BY pv.id_feature),
+                    MAX(pv.numeric_value) FILTER (WHERE f.is_target),
+                    MAX(pv.string_value) FILTER (WHERE f.is_target)
+                FROM grafana_ml_model_point_value pv
+                JOIN grafana_ml_model_feature f ON f.id = pv.id_feature
+                WHERE pv.id_source = %(source_id)s
+                  {after_filter}
+                  AND NOT EXISTS (
+                      SELECT 1 FROM grafana_ml_model_point_vector v WHERE v.id_point = pv.id_point
+                  )
+                GROUP BY pv.id_source, pv.id_point
+            """, {"source_id": source_id, "after_point": after_point})
+            return cursor.rowcount
+
+    def delete(self, id_point: int) -> None:
+        with self.connect() as cursor:
+            cursor.execute("DELETE FROM grafana_ml_model_point_vector WHERE id_point = %s", (id_point,))
+
+    def delete_by_source(self, source_id: int) -> None:
+        """Elimina todos los vectores asociados a un id_source."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute("DELETE FROM grafana_ml_model_point_vector WHERE id_source = %s", (source_id,))
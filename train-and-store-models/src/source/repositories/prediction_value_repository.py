@@ -24,6 +24,15 @@ class PredictionValueRepository(Repository[PredictionValue]):
             cursor.execute("SELECT id_source, class_name, id_prediction FROM grafana_ml_model_prediction_values")
             return [PredictionValue(*row) for row in cursor.fetchall()]
 
+    def get_by_source(self, source_id: int) -> List[PredictionValue]:
+        """Clases de la variable objetivo de una fuente en el orden en que se crearon."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                "SELECT id_source, class_name, id_prediction FROM grafana_ml_model_prediction_values WHERE id_source = %s ORDER BY id_prediction",
+                (source_id,)
+            )
+            return [PredictionValue(*row) for row in cursor.fetchall()]
+
     def add(self, item: PredictionValue) -> None:
         with self.connect() as cursor:
             cursor.execute(
@@ -32,6 +41,23 @@ class PredictionValueRepository(Repository[PredictionValue]):
             )
             item.id_prediction = cursor.fetchone()[0]
 
+    def add_prediction_values(self, items: List[PredictionValue]) -> List[int]:
+        """
+        Inserta en bloque todas las clases de la variable objetivo dentro de la transacción en curso.
+        Los ids se asignan en el mismo orden que `items`.
+        """
+        with self.connect(autocommit=False) as cursor:
+            ids = self.reserve_ids(cursor, "grafana_ml_model_prediction_values", "id_prediction", len(items))
+            for item, id in zip(items, ids):
+                item.id_prediction = id
+            self.copy_rows(
+                cursor,
+                "grafana_ml_model_prediction_values",
+                ["id_prediction", "id_source", "class_name"],
+                ((item.id_prediction, item.id_source, item.class_name) for item in items)
+            )
+        return ids
+
     def update(self, id_prediction: int, **kwargs: object) -> None:
         allowed = ["id_source", "class_name"]
         fields = [f"{k} = %s" for k in allowed if k in kwargs]
@@ -1,11 +1,13 @@
-from typing import List, Tuple
+from typing import List, Optional
 
 import numpy as np
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.sql import SQL, Composed, Literal
 
 from ...crc.repositories.repository import Repository
-from ...exceptions.exceptions import (NoTargetException,
-                                      NotEnoughVariablesException,
+from ...exceptions.exceptions import (NotEnoughVariablesException,
                                       SourceNotFoundException)
+from ..entities.source_data_entity import SourceData
 from ..entities.source_entity import Source
 
 
@@ -17,7 +19,7 @@ class SourceRepository(Repository[Source]):
         """Obtiene un Source por su ID."""
         with self.connect() as cursor:
             cursor.execute(
-                "SELECT name, source, creator, description, id FROM grafana_ml_model_source WHERE id = %s",
+                "SELECT name, source, creator, description, id, watermark_column, watermark_value, fingerprint FROM grafana_ml_model_source WHERE id = %s",
                 (id,)
             )
             row = cursor.fetchone()
@@ -28,7 +30,7 @@ class SourceRepository(Repository[Source]):
     def get_all(self) -> List[Source]:
         """Obtiene todos los Sources."""
         with self.connect() as cursor:
-            cursor.execute("SELECT name, source, creator, description, id FROM grafana_ml_model_source")
+            cursor.execute("SELECT name, source, creator, description, id, watermark_column, watermark_value, fingerprint FROM grafana_ml_model_source")
             return [Source(*row) for row in cursor.fetchall()]
 
     def add(self, item: Source) -> None:
@@ -36,16 +38,17 @@ class SourceRepository(Repository[Source]):
         with self.connect() as cursor:
             cursor.execute(
                 """
-                INSERT INTO grafana_ml_model_source (name, source, creator, description)
-                VALUES (%s, %s, %s, %s) RETURNING id
+                INSERT INTO grafana_ml_model_source (name, source, creator, description, watermark_column, watermark_value, fingerprint)
+                VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
                 """,
-                (item.name, item.source, item.creator, item.description)
+                (item.name, item.source, item.creator, item.description, item.watermark_column, item.watermark_value,
+                 item.fingerprint)
             )
             item.id = cursor.fetchone()[0]
         
     def update(self, id: int, **kwargs: object) -> None:
         """Actualiza un Source por su ID."""
-        allowed = ["name", "source", "creator", "description"]
+        allowed = ["name", "source", "creator", "description", "watermark_column", "watermark_value"]
         fields = [f"{k} = %s" for k in allowed if k in kwargs]
         values = [kwargs[k] for k in allowed if k in kwargs]
         if not fields:
@@ -57,261 +60,201 @@ class SourceRepository(Repository[Source]):
                 tuple(values)
             )
 
-    def delete(self, id: int) -> None:
-        """Elimina un Source por su ID."""
-        with self.connect(autocommit=False) as cursor:
-            cursor.execute("DELETE FROM grafana_ml_model_source WHERE id = %s", (id,))
-    
-    def get_numeric_data(self, id_source: int) -> Tuple[List[dict], List[dict]]:
-        with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
-                raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-        
-            # Obtener valores numéricos por punto
-            cursor.execute("""
-                SELECT
-                    pv.id_point,
-                    p.name,
-                    array_agg(pv.numeric_value ORDER BY f.id) AS features
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                JOIN grafana_ml_model_point p ON p.id = pv.id_point
-                WHERE pv.id_source = %s AND pv.numeric_value IS NOT NULL
-                GROUP BY pv.id_point, p.name
-                ORDER BY pv.id_point
-            """, (id_source,))
-            data = [{'id_point': row[0], 'name': row[1], 'features': row[2]} for row in cursor.fetchall()]
-
-            # Obtener características numéricas 
-            cursor.execute("""
-                SELECT DISTINCT f.id, f.name
-                FROM grafana_ml_model_feature f
-                JOIN grafana_ml_model_point_value pv ON f.id = pv.id_feature
-                WHERE f.id_source = %s AND pv.numeric_value IS NOT NULL
-                ORDER BY f.id
-            """, (id_source,))
-            features = [{'id_feature': row[0], 'name': row[1]} for row in cursor.fetchall()]
-
-        if len(features) < 2:
-            raise NotEnoughVariablesException("Se requieren al menos dos características numéricas para ejecutar el algoritmo.")
-
-        return data, features
-    
-    def get_numeric_data_with_numeric_target(self, id_source: int) -> Tuple[List[dict], List[dict]]:
-        with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
-                raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-            
-            # Obtener características numéricas
-            cursor.execute("""
-                SELECT DISTINCT f.id, f.name, f.is_target
-                FROM grafana_ml_model_feature f
-                JOIN grafana_ml_model_point_value pv ON f.id = pv.id_feature
-                WHERE f.id_source = %s AND pv.numeric_value IS NOT NULL
-                ORDER BY f.id
-            """, (id_source,))
-            features = [{'id_feature': f[0], 'name': f[1], 'is_target': f[2]} for f in cursor.fetchall()]
-
-            if not any(f['is_target'] for f in features):
-                raise NoTargetException("No se encontró una variable objetivo numérica en las características.")
-            if not any(not f['is_target'] for f in features):
-                raise NotEnoughVariablesException("Se requiere al menos una característica numérica para ejecutar el algoritmo.")
-
-            # Obtener valores por punto, incluyendo el target
-            cursor.execute("""
-                SELECT
-                    pv.id_point,
-                    array_agg(pv.numeric_value ORDER BY f.id) AS features,
-                    MAX(pv.numeric_value) FILTER (WHERE f.is_target) AS target_numeric
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                WHERE pv.id_source = %s AND pv.numeric_value IS NOT NULL
-                GROUP BY pv.id_point
-                ORDER BY pv.id_point
-            """, (id_source,))
-            data = [
-                {'id_point': row[0], 'features': row[1], 'target': row[2]}
-                for row in cursor.fetchall()
-            ]
-            
-        features = [f for f in features if not f['is_target']]
-
-        return data, features
-        
-    def get_numeric_data_with_target(self, id_source: int) -> Tuple[List[dict], List[dict]]:
-        with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
-                raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-            
-            # Obtener metadatos de características
-            cursor.execute("""
-                SELECT id, name, is_target
-                FROM grafana_ml_model_feature
-                WHERE id_source = %s
-                ORDER BY id
-            """, (id_source,))
-            features = [{'id_feature': row[0], 'name': row[1], 'is_target': row[2]} for row in cursor.fetchall()]
-            
-            if not any(not f['is_target'] for f in features):
-                raise NotEnoughVariablesException("Se requiere al menos una característica numérica para ejecutar el algoritmo.")
-            if not any(f['is_target'] for f in features):
-                raise NoTargetException("No se encontró una variable objetivo en las características.")
-
-            # Obtener valores por punto
-            cursor.execute("""
-                SELECT
-                    pv.id_point,
-                    array_agg(pv.numeric_value ORDER BY f.id) FILTER (WHERE NOT f.is_target) AS numeric_features,
-                    MAX(pv.numeric_value) FILTER (WHERE f.is_target) AS target_numeric,
-                    MAX(pv.string_value) FILTER (WHERE f.is_target) AS target_string
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                WHERE pv.id_source = %s
-                GROUP BY pv.id_point
-                ORDER BY pv.id_point
-            """, (id_source,))
-            data = [
-                {'id_point': row[0], 'features': row[1], 'target': row[2] if row[2] is not None else row[3]}
-                for row in cursor.fetchall()
-            ]
-            
-        features = [f for f in features if not f['is_target']]
-
-        return data, features
-
-    def get_data_for_classification(self, id_source: int) -> Tuple[np.ndarray, np.ndarray, List[dict], List[dict]]:
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[int]:
+        """Id de la fuente más antigua cargada con la misma huella (sin marca de agua), o None si no existe."""
         with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
-                raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-            
-            # Obtener características 
-            cursor.execute("""
-                SELECT id, name, is_target
-                FROM grafana_ml_model_feature
-                WHERE id_source = %s
+            cursor.execute(
+                """
+                SELECT id FROM grafana_ml_model_source
+                WHERE fingerprint = %s AND watermark_column IS NULL
                 ORDER BY id
-            """, (id_source,))
-        
-            rows = cursor.fetchall()
-            features = []
-            target_id = None
-            for id, name, is_target in rows:
-                if is_target:
-                    target_id = id
-                else:
-                    features.append({'id_feature': id, 'name': name})
-
-            if target_id is None:
-                raise ValueError("No se encontró una variable objetivo.")
-
-            # Determinar el tipo de la variable objetivo
-            cursor.execute("""
-                SELECT DISTINCT numeric_value, string_value
-                FROM grafana_ml_model_point_value
-                WHERE id_source = %s AND id_feature = %s
-            """, (id_source, target_id))
-            
-            values = cursor.fetchall()
-            numeric_values = {v[0] for v in values if v[0] is not None}
-            string_values = {v[1] for v in values if v[1] is not None}
+                LIMIT 1
+                """,
+                (fingerprint,)
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
 
-            if not string_values and len(numeric_values) != 2:
-                raise ValueError("La variable objetivo debe ser categórica o numérica binaria.")
+    def update_watermark(self, id: int, watermark_value: str) -> None:
+        """Guarda la nueva marca de agua dentro de la transacción en curso (sin commit)."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                "UPDATE grafana_ml_model_source SET watermark_value = %s WHERE id = %s",
+                (watermark_value, id)
+            )
 
-            # Obtener datos: características numéricas + objetivo
-            cursor.execute("""
-                SELECT
-                    pv.id_point,
-                    array_agg(pv.numeric_value ORDER BY f.id) FILTER (WHERE NOT f.is_target) AS numeric_features,
-                    MAX(COALESCE(pv.string_value, pv.numeric_value::text)) FILTER (WHERE f.id = %s) AS target_value
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                WHERE pv.id_source = %s
-                GROUP BY pv.id_point
-                ORDER BY pv.id_point
-            """, (target_id, id_source))
-            
-            rows = cursor.fetchall()
-            X = np.array([row[1] for row in rows])
-            y = np.array([row[2] for row in rows])
+    def update_fingerprint(self, id: int, fingerprint: str) -> None:
+        """
+        Guarda la huella dentro de la transacción de la carga (sin commit): la fuente solo puede
+        reutilizarse una vez que sus datos están confirmados.
+        """
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                "UPDATE grafana_ml_model_source SET fingerprint = %s WHERE id = %s",
+                (fingerprint, id)
+            )
 
-            # Obtener lista de clases 
-            cursor.execute("""
-                SELECT id_prediction AS id, class_name AS name
-                FROM grafana_ml_model_prediction_values
-                WHERE id_source = %s
-                ORDER BY id_prediction
-            """, (id_source,))
-            class_list = [{'id_prediction': row[0], 'name': row[1]} for row in cursor.fetchall()]
+    def count_create_tasks(self, id: int) -> int:
+        """Número de tareas de creación vigentes vinculadas a la fuente (más de una si se ha reutilizado)."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                """
+                SELECT COUNT(*) FROM grafana_ml_model_source_create
+                WHERE id_source = %s AND state <> 'eliminado'
+                """,
+                (id,)
+            )
+            return cursor.fetchone()[0]
 
-            return X, y, features, class_list
+    def release_create_task(self, id: int) -> int:
+        """
+        Marca como eliminada la tarea de creación vigente más reciente de la fuente, dentro de la
+        transacción en curso (sin commit), y devuelve su id. Deja de contar entre las que usan la fuente.
+        """
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute(
+                """
+                UPDATE grafana_ml_model_source_create
+                SET state = 'eliminado'
+                WHERE id = (
+                    SELECT id FROM grafana_ml_model_source_create
+                    WHERE id_source = %s AND state <> 'eliminado'
+                    ORDER BY id DESC
+                    LIMIT 1
+                    FOR UPDATE
+                )
+                RETURNING id
+                """,
+                (id,)
+            )
+            return cursor.fetchone()[0]
 
-    def get_binary_data(self, id_source: int) -> Tuple[np.ndarray, List[dict]]:
+    def get_version(self, id_source: int) -> str:
+        """
+        Sello de versión de los datos de la fuente: número de puntos e id del último punto.
+        Cambia cada vez que la fuente se carga o se actualiza.
+        """
         with self.connect() as cursor:
-            # Verificar si existe la fuente
-            cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
-            if cursor.fetchone() is None:
+            cursor.execute(
+                """
+                SELECT COUNT(v.id_point), COALESCE(MAX(v.id_point), 0)
+                FROM grafana_ml_model_source s
+                LEFT JOIN grafana_ml_model_point_vector v ON v.id_source = s.id
+                WHERE s.id = %s
+                GROUP BY s.id
+                """,
+                (id_source,)
+            )
+            row = cursor.fetchone()
+            if row is None:
                 raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
-            
-            # Consulta para obtener las características numéricas por punto
-            cursor.execute("""
-                SELECT
-                    array_agg(pv.numeric_value ORDER BY f.id) AS features
-                FROM grafana_ml_model_point_value pv
-                JOIN grafana_ml_model_feature f ON pv.id_feature = f.id
-                WHERE pv.id_source = %s AND pv.numeric_value IS NOT NULL
-                GROUP BY pv.id_point
-                ORDER BY pv.id_point
-            """, (id_source,))
-            features_by_point = cursor.fetchall()
+            return f"{row[0]}_{row[1]}"
 
-            # Consulta para obtener los nombres de las características
+    def delete(self, id: int) -> None:
+        """Elimina un Source por su ID."""
+        with self.connect(autocommit=False) as cursor:
+            cursor.execute("DELETE FROM grafana_ml_model_source WHERE id = %s", (id,))
+    
+    def get_source_data(self, id_source: int) -> SourceData:
+        """
+        Lee los datos de la fuente en forma columnar: los vectores de los puntos con COPY binario
+        directamente a una matriz de NumPy, y los nombres de los puntos y el objetivo como texto.
+        Todas las lecturas se hacen en una transacción REPEATABLE READ de solo lectura: ven la misma
+        instantánea, así que una actualización concurrente de la fuente no desalinea sus filas.
+        """
+        connection = self.db.connection
+        try:
+            with self.connect() as cursor:
+                # Debe ser la primera sentencia de la transacción; dentro de una ya abierta se usa la de esta
+                if connection.info.transaction_status == TRANSACTION_STATUS_IDLE:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                return self._read_source_data(cursor, id_source)
+        except Exception:
+            connection.rollback()
+            raise
+
+    def _read_source_data(self, cursor, id_source: int) -> SourceData:
+        cursor.execute("SELECT 1 FROM grafana_ml_model_source WHERE id = %s", (id_source,))
+        if cursor.fetchone() is None:
+            raise SourceNotFoundException(f"No existe la fuente con id {id_source}.")
+
+        # Características ordenadas por id: la misma posición que en el vector de cada punto
+        cursor.execute("""
+            SELECT id, name, is_target
+            FROM grafana_ml_model_feature
+            WHERE id_source = %s
+            ORDER BY id
+        """, (id_source,))
+        features = cursor.fetchall()
+        if not features:
+            raise NotEnoughVariablesException("La fuente no tiene características.")
+
+        point_ids, values = self.copy_out_matrix(
+            cursor, self._vector_select(id_source, list(range(1, len(features) + 1))), len(features),
+            rows=self._count_points(cursor, id_source)
+        )
+        point_names = self.copy_out_text(cursor, SQL("""
+            SELECT p.name
+            FROM grafana_ml_model_point_vector v
+            JOIN grafana_ml_model_point p ON p.id = v.id_point
+            WHERE v.id_source = {}
+            ORDER BY v.id_point
+        """).format(Literal(id_source)))
+
+        target_labels = np.array([], dtype=str)
+        categorical_target = False
+        if any(is_target for _, _, is_target in features):
             cursor.execute("""
-                SELECT id, name
-                FROM grafana_ml_model_feature
-                WHERE id_source = %s AND id IN (
-                    SELECT DISTINCT id_feature
-                    FROM grafana_ml_model_point_value
-                    WHERE id_source = %s AND numeric_value IS NOT NULL
+                SELECT EXISTS (
+                    SELECT 1 FROM grafana_ml_model_point_vector
+                    WHERE id_source = %s AND target_string IS NOT NULL
                 )
-                ORDER BY id
-            """, (id_source, id_source))
-            feature_names = cursor.fetchall()
-            
-        features_by_point = [list(row[0]) for row in features_by_point]
-
-        # Filtrar características binarias (que solo tienen valores 0 y 1)
-        binary_features_by_point = []
-        binary_feature_names = []
-
-        for col_idx in range(len(features_by_point[0])):
-            column_values = [row[col_idx] for row in features_by_point]  # Extraer la columna
-
-            if all(value in [0, 1] for value in column_values):
-                binary_features_by_point.append([row[col_idx] for row in features_by_point])  
-                binary_feature_names.append(feature_names[col_idx])
-
-        # Comprobar si hay al menos 2 características binarias
-        if len(binary_feature_names) < 2:
-            raise NotEnoughVariablesException("Se requieren al menos dos características binarias para ejecutar el algoritmo.")
-
-        data = np.array(binary_features_by_point).T  # Transponer los datos para tener puntos como filas
-        features = [
-            {'id_feature': row[0], 'name': row[1]}
-            for row in binary_feature_names
-        ]
-
-        return data, features
-
-
-
-
-
+            """, (id_source,))
+            categorical_target = cursor.fetchone()[0]
+            target_labels = self.copy_out_text(cursor, SQL("""
+                SELECT COALESCE(target_string, target_numeric::text)
+                FROM grafana_ml_model_point_vector
+                WHERE id_source = {}
+                ORDER BY id_point
+            """).format(Literal(id_source)))
+
+        cursor.execute("""
+            SELECT id_prediction, class_name
+            FROM grafana_ml_model_prediction_values
+            WHERE id_source = %s
+            ORDER BY id_prediction
+        """, (id_source,))
+        classes = cursor.fetchall()
+
+        return SourceData(
+            point_ids=point_ids,
+            point_names=point_names,
+            feature_ids=np.array([row[0] for row in features], dtype=np.int64),
+            feature_names=np.array([row[1] for row in features], dtype=str),
+            is_target=np.array([row[2] for row in features], dtype=bool),
+            values=values,
+            target_labels=target_labels,
+            categorical_target=np.array(categorical_target),
+            class_ids=np.array([row[0] for row in classes], dtype=np.int64),
+            class_names=np.array([row[1] for row in classes], dtype=str)
+        )
+
+    @staticmethod
+    def _count_points(cursor, id_source: int) -> int:
+        """Número de puntos de la fuente, para reservar la matriz antes de leerla."""
+        cursor.execute("SELECT COUNT(*) FROM grafana_ml_model_point_vector WHERE id_source = %s", (id_source,))
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _vector_select(id_source: int, positions: List[int]) -> Composed:
+        """
+        Consulta con el id del punto y una columna double precision por posición del vector,
+        sin nulos para que todas las filas midan lo mismo en COPY binario.
+        """
+        columns = [SQL("COALESCE(v.numeric_values[{}], 'NaN')").format(Literal(p)) for p in positions]
+        return SQL("""
+            SELECT v.id_point, {}
+            FROM grafana_ml_model_point_vector v
+            WHERE v.id_source = {}
+            ORDER BY v.id_point
+        """).format(SQL(", ").join(columns), Literal(id_source))
@@ -1,5 +1,5 @@
 from ..source.manager.source_manager import SourceManager
-from .task_entity import TaskCreateSource, TaskDeleteSource
+from .task_entity import TaskCreateSource, TaskDeleteSource, TaskRefreshSource
 from .task_query import TaskQuery
 
 
@@ -9,7 +9,11 @@ class SourceExecutor:
         self.source_manager = SourceManager()
         
     def create_source(self, task: TaskCreateSource):
-        return self.source_manager.create(task.name, task.description, task.creator, task.target, task.source)
+        return self.source_manager.create(task.name, task.description, task.creator, task.target, task.source,
+                                          task.watermark, task.parameters)
+
+    def refresh_source(self, task: TaskRefreshSource):
+        return self.source_manager.refresh(task.id_source)
 
     def delete_source(self, task: TaskDeleteSource):
-        self.source_manager.delete(task.id_source)
\ No newline at end of file
+        return self.source_manager.delete(task.id_source)
\ No newline at end of file
@@ -14,13 +14,15 @@ class TaskDeleteModel:
         self.date = date
 
 class TaskCreateSource:
-    def __init__(self, id, name, description, creator, source, target, state):
+    def __init__(self, id, name, description, creator, source, target, watermark, parameters, state):
         self.id = id
         self.name = name
         self.description = description
         self.creator = creator
         self.source = source
         self.target = target
+        self.watermark = watermark
+        self.parameters = parameters
         self.state = state
 
 class TaskDeleteSource:
@@ -29,3 +31,10 @@ class TaskDeleteSource:
         self.id_source = id_source
         self.state = state
         self.date = date
+
+class TaskRefreshSource:
+    def __init__(self, id, id_source, state, date):
+        self.id = id
+        self.id_source = id_source
+        self.state = state
+        self.date = date
@@ -3,7 +3,7 @@ import json
 
 from ..database.database_connection import DatabaseConnection
 from .task_entity import (TaskCreateModel, TaskCreateSource, TaskDeleteModel,
-                          TaskDeleteSource)
+                          TaskDeleteSource, TaskRefreshSource)
 
 
 class TaskQuery:
@@ -34,7 +34,7 @@ class TaskQuery:
     def get_pending_create_source_tasks(self):
         with self.connect() as cursor:
             query = """
-            SELECT id, name, description, creator, source, target, state
+            SELECT id, name, description, creator, source, target, watermark, parameters, state
             FROM grafana_ml_model_source_create
             WHERE state = 'pendiente';
             """
@@ -63,6 +63,17 @@ class TaskQuery:
             cursor.execute(query)
             results = cursor.fetchall()
             return [TaskDeleteSource(*row) for row in results]
+
+    def get_pending_refresh_source_tasks(self):
+        with self.connect() as cursor:
+            query = """
+            SELECT id, id_source, state, date
+            FROM grafana_ml_model_source_refresh
+            WHERE state = 'pendiente';
+            """
+            cursor.execute(query)
+            results = cursor.fetchall()
+            return [TaskRefreshSource(*row) for row in results]
         
     def mark_task_done(self, table_name, task_id):
         with self.connect() as cursor:
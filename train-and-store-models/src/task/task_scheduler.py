@@ -1,6 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from psycopg2.errors import ForeignKeyViolation
 
 from ..database.database_connection import DatabaseConnection
+from ..source.manager.source_data_cache import SourceDataCache
 from ..utils.utils import Utils
 from ..utils.summary_processor import SummaryProcessor
 from ..notifications.notifier import Notifier
@@ -15,11 +19,13 @@ class TaskScheduler:
         self.task_notifications = flags.get("task_notifications", True)
         self.general_notifications = flags.get("general_notifications", True)
         self.use_summary = flags.get("generate_summary", False)
+        self.source_workers = Utils.get_source_workers()
 
         self.table_model_create = 'grafana_ml_model_task_create'
         self.table_model_delete = 'grafana_ml_model_task_delete'
         self.table_source_create = 'grafana_ml_model_source_create'
         self.table_source_delete = 'grafana_ml_model_source_delete'
+        self.table_source_refresh = 'grafana_ml_model_source_refresh'
 
         self.task_query = TaskQuery()
         self.model_executor = ModelExecutor()
@@ -27,6 +33,7 @@ class TaskScheduler:
         self.conn = DatabaseConnection().connection
 
         self.notify = notify or Notifier().send
+        self._lock = threading.Lock()
         self.resumen = self._init_summary() if self.use_summary else None
         
         if auto_run:
@@ -38,25 +45,34 @@ class TaskScheduler:
             "modelos_eliminados": [],
             "fuentes_creadas": [],
             "fuentes_eliminadas": [],
+            "fuentes_actualizadas": [],
             "errores": []
         }
 
     def _notify(self, title, message, duration=5):
         if self.task_notifications:
-            self.notify(title, message, duration)
+            with self._lock:
+                self.notify(title, message, duration)
 
     def _add_error(self, message):
         if self.use_summary:
-            self.resumen["errores"].append({"mensaje": message})
+            with self._lock:
+                self.resumen["errores"].append({"mensaje": message})
 
     def run(self):
         if self.general_notifications:
              self.notify("🕒 GrafanaML", "Ejecutando tareas pendientes...")
             
-        self._handle_create_sources()
-        self._handle_create_models()
-        self._handle_delete_models()
-        self._handle_delete_sources()
+        # Las fuentes cargadas se comparten entre los modelos de esta ejecución y no más allá
+        SourceDataCache.clear()
+        try:
+            self._handle_create_sources()
+            self._handle_refresh_sources()
+            self._handle_create_models()
+            self._handle_delete_models()
+            self._handle_delete_sources()
+        finally:
+            SourceDataCache.clear()
         
         if self.use_summary:
             SummaryProcessor(
@@ -105,21 +121,57 @@ class TaskScheduler:
                 self._add_error(msg)
 
     def _handle_create_sources(self):
-        for task in self.task_query.get_pending_create_source_tasks():
+        tasks = self.task_query.get_pending_create_source_tasks()
+        if self.source_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                self._create_source(task)
+            return
+
+        # Cada hilo trabaja con su propia conexión, que se cierra al terminar la tarea
+        with ThreadPoolExecutor(max_workers=self.source_workers) as pool:
+            list(pool.map(self._create_source_in_worker, tasks))
+
+    def _create_source_in_worker(self, task):
+        try:
+            self._create_source(task)
+        finally:
+            DatabaseConnection().close_thread_connection()
+
+    def _create_source(self, task):
+        try:
+            self.task_query.mark_task_running(self.table_source_create, task.id)
+            source_id = self.source_executor.create_source(task)
+            self.task_query.bind_source_to_task(task.id, source_id)
+            self.task_query.mark_task_done(self.table_source_create, task.id)
+            
+            self._notify(f"✅ Tarea {task.id}", f"Fuente creada con ID: {source_id}")
+            if self.use_summary:
+                with self._lock:
+                    self.resumen["fuentes_creadas"].append(source_id)
+                
+        except Exception as e:
+            DatabaseConnection().connection.rollback()
+            self.task_query.mark_task_failed(self.table_source_create, task.id)
+            msg = f"Error al crear fuente en tarea {task.id}: {str(e)}"
+            
+            self._notify(f"❌ Tarea {task.id}", msg, 6)
+            self._add_error(msg)
+
+    def _handle_refresh_sources(self):
+        for task in self.task_query.get_pending_refresh_source_tasks():
             try:
-                self.task_query.mark_task_running(self.table_source_create, task.id)
-                source_id = self.source_executor.create_source(task)
-                self.task_query.bind_source_to_task(task.id, source_id)
-                self.task_query.mark_task_done(self.table_source_create, task.id)
+                self.task_query.mark_task_running(self.table_source_refresh, task.id)
+                new_points = self.source_executor.refresh_source(task)
+                self.task_query.mark_task_done(self.table_source_refresh, task.id)
                 
-                self._notify(f"✅ Tarea {task.id}", f"Fuente creada con ID: {source_id}")
+                self._notify(f"✅ Tarea {task.id}", f"Fuente {task.id_source} actualizada con {new_points} puntos nuevos")
                 if self.use_summary:
-                    self.resumen["fuentes_creadas"].append(source_id)
+                    self.resumen["fuentes_actualizadas"].append(task.id_source)
                     
             except Exception as e:
                 self.conn.rollback()
-                self.task_query.mark_task_failed(self.table_source_create, task.id)
-                msg = f"Error al crear fuente en tarea {task.id}: {str(e)}"
+                self.task_query.mark_task_failed(self.table_source_refresh, task.id)
+                msg = f"Error al actualizar fuente en tarea {task.id}: {str(e)}"
                 
                 self._notify(f"❌ Tarea {task.id}", msg, 6)
                 self._add_error(msg)
@@ -128,8 +180,15 @@ class TaskScheduler:
         for task in self.task_query.get_pending_delete_source_tasks():
             try:
                 self.task_query.mark_task_running(self.table_source_delete, task.id)
-                self.source_executor.delete_source(task)
+                released_task = self.source_executor.delete_source(task)
                 self.task_query.mark_task_done(self.table_source_delete, task.id)
+
+                if released_task is not None:
+                    # Fuente compartida: sus datos se conservan para las demás tareas de creación
+                    self._notify(f"✅ Tarea {task.id}",
+                                 f"Fuente {task.id_source} compartida: se liberó la tarea de creación {released_task}")
+                    continue
+
                 self.task_query.mark_source_eliminated(task.id_source)
                 
                 self._notify(f"✅ Tarea {task.id}", "Fuente eliminada exitosamente")
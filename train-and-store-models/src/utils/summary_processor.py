@@ -43,6 +43,8 @@ class SummaryProcessor:
                 f.write(f"Fuentes creadas: {', '.join(map(str, resumen['fuentes_creadas']))}\n")
             if resumen["fuentes_eliminadas"]:
                 f.write(f"Fuentes eliminadas: {', '.join(map(str, resumen['fuentes_eliminadas']))}\n")
+            if resumen["fuentes_actualizadas"]:
+                f.write(f"Fuentes actualizadas: {', '.join(map(str, resumen['fuentes_actualizadas']))}\n")
 
             if errores:
                 f.write("Errores encontrados:\n")
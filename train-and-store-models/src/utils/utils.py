@@ -34,3 +34,72 @@ class Utils:
         parser.read(config_path)
 
         return int(parser['scheduler']['interval_minutes'])
+
+    @staticmethod
+    def get_source_workers():
+        """Número de fuentes que se crean a la vez (1 = secuencial)."""
+        config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+        parser = configparser.ConfigParser()
+        parser.read(config_path)
+
+        return max(1, parser.getint("scheduler", "source_workers", fallback=1))
+
+    @staticmethod
+    def load_ingest_settings():
+        """
+        Lee la sección [ingest] con los parámetros de carga masiva de fuentes.
+        """
+        config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+        parser = configparser.ConfigParser()
+        parser.read(config_path)
+
+        return {
+            "batch_size": parser.getint("ingest", "batch_size", fallback=100000),
+            "chunk_size": parser.getint("ingest", "chunk_size", fallback=50000),
+            "row_limit": parser.getint("ingest", "row_limit", fallback=0),
+            "defer_constraints": parser.getboolean("ingest", "defer_constraints", fallback=True),
+            "mode": parser.get("ingest", "mode", fallback="stream"),
+            "parallel_workers": max(1, parser.getint("ingest", "parallel_workers", fallback=4)),
+            "reuse_identical": parser.getboolean("ingest", "reuse_identical", fallback=True)
+        }
+
+    @staticmethod
+    def get_matrix_dtype() -> np.dtype:
+        """
+        Precisión de las matrices de características en los algoritmos que la toleran
+        ([models] precision = float64 | float32). float32 reduce a la mitad la memoria usada.
+        """
+        config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+        parser = configparser.ConfigParser()
+        parser.read(config_path)
+
+        precision = parser.get("models", "precision", fallback="float64")
+        if precision not in ("float64", "float32"):
+            raise ValueError(f"Precisión no soportada: '{precision}'. Valores válidos: float64, float32.")
+        return np.dtype(precision)
+
+    @staticmethod
+    def get_write_batch_size() -> int:
+        """Filas por sentencia COPY en las escrituras en bloque de los modelos ([models] write_batch_size)."""
+        config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'))
+        parser = configparser.ConfigParser()
+        parser.read(config_path)
+
+        return max(1, parser.getint("models", "write_batch_size", fallback=10000))
+
+    @staticmethod
+    def load_cache_settings():
+        """
+        Lee la sección [cache] con la configuración de las cachés (en disco y en memoria) de las matrices de las fuentes.
+        Un directorio relativo se toma respecto a la carpeta del proyecto.
+        """
+        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+        parser = configparser.ConfigParser()
+        parser.read(os.path.join(base_path, 'config', 'config.ini'))
+
+        return {
+            "enabled": parser.getboolean("cache", "enabled", fallback=True),
+            "directory": os.path.join(base_path, parser.get("cache", "directory", fallback="cache")),
+            "max_size_mb": max(0, parser.getint("cache", "max_size_mb", fallback=1024)),
+            "memory_mb": max(0, parser.getint("cache", "memory_mb", fallback=512))
+        }
\ No newline at end of file
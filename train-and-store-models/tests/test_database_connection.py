@@ -0,0 +1,27 @@
+from src.database.database_connection import DatabaseConnection
+
+
+def test_for_worker_skips_schema_and_index_checks(monkeypatch):
+    def fail(self):
+        raise AssertionError("no debe comprobarse el esquema en un proceso de trabajo")
+
+    monkeypatch.setattr(DatabaseConnection, "_instance", None)
+    monkeypatch.setattr(DatabaseConnection, "_initialize_database", fail)
+    monkeypatch.setattr(DatabaseConnection, "_ensure_indexes", fail)
+
+    database = DatabaseConnection.for_worker()
+
+    # Las demás clases del proceso reciben la misma instancia
+    assert DatabaseConnection() is database
+    assert DatabaseConnection.for_worker() is database
+
+
+def test_first_instance_checks_schema_and_indexes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(DatabaseConnection, "_instance", None)
+    monkeypatch.setattr(DatabaseConnection, "_initialize_database", lambda self: calls.append("schema"))
+    monkeypatch.setattr(DatabaseConnection, "_ensure_indexes", lambda self: calls.append("indexes"))
+
+    DatabaseConnection()
+
+    assert calls == ["schema", "indexes"]
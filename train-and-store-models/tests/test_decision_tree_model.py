@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from src.da.models.decision_tree_model import DecisionTreeModel
+
+
+def test_get_relations_links_children_to_parents():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(60, 3))
+    y = np.where(X[:, 0] + X[:, 1] > 0, "a", np.where(X[:, 2] > 0, "b", "c"))
+    model = DecisionTreeModel()
+    model.train(pd.DataFrame(X, columns=["f0", "f1", "f2"]), pd.Series(y), ["f0", "f1", "f2"], max_depth=3)
+    nodes, _ = model.get_nodes()
+
+    parents, lefts, rights, is_leaf = DecisionTreeModel.get_relations(nodes)
+
+    tree = model.modelo.tree_
+    np.testing.assert_array_equal(lefts, tree.children_left)
+    np.testing.assert_array_equal(rights, tree.children_right)
+    np.testing.assert_array_equal(is_leaf, tree.children_left == -1)
+
+    # Cada nodo tiene como padre el nodo que lo referencia como hijo; la raíz no tiene padre
+    assert parents[0] == -1
+    for node in np.flatnonzero(~is_leaf):
+        assert parents[tree.children_left[node]] == node
+        assert parents[tree.children_right[node]] == node
+    assert (parents[1:] >= 0).all()
+
+
+def test_get_relations_with_single_leaf():
+    model = DecisionTreeModel()
+    model.train(pd.DataFrame({"f0": [1.0, 2.0]}), pd.Series(["a", "a"]), ["f0"])
+    nodes, _ = model.get_nodes()
+
+    parents, _, _, is_leaf = DecisionTreeModel.get_relations(nodes)
+
+    np.testing.assert_array_equal(parents, [-1])
+    np.testing.assert_array_equal(is_leaf, [True])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import linkage, to_tree
+
+from src.crc.algorithms.linkage_tree import linkage_tree_rows
+
+
+def test_linkage_tree_rows_match_scipy_tree():
+    rng = np.random.default_rng(1)
+    points = rng.normal(size=(9, 2))
+    point_ids = list(range(100, 109))
+    point_names = [f"point_{i + 1}" for i in range(9)]
+    Z = linkage(points, method="ward")
+
+    names, heights, parents, saved_points = linkage_tree_rows(Z, point_ids, point_names)
+
+    total = 2 * len(point_ids) - 1
+    assert len(names) == len(heights) == len(parents) == len(saved_points) == total
+
+    # El nodo i del árbol de SciPy se escribe en la fila total - 1 - i, la raíz primero
+    def row(node):
+        return total - 1 - node.id
+
+    root = to_tree(Z)
+    assert row(root) == 0 and parents[0] == -1
+
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        assert heights[row(node)] == pytest.approx(node.dist)
+        if node.is_leaf():
+            assert names[row(node)] == point_names[node.id]
+            assert saved_points[row(node)] == point_ids[node.id]
+        else:
+            assert names[row(node)] == f"node_{node.id}"
+            assert saved_points[row(node)] is None
+            for child in (node.left, node.right):
+                # Cada padre se escribe antes que sus hijos
+                assert parents[row(child)] == row(node) < row(child)
+                pending.append(child)
+
+
+def test_linkage_tree_rows_with_one_point():
+    names, heights, parents, points = linkage_tree_rows(np.empty((0, 4)), [7], ["point_1"])
+
+    assert names == ["point_1"]
+    np.testing.assert_array_equal(heights, [0.0])
+    np.testing.assert_array_equal(parents, [-1])
+    assert points == [7]
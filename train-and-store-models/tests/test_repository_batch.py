@@ -0,0 +1,134 @@
+import contextlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+
+from src.crc.repositories.repository import Repository
+
+
+@dataclass
+class _Item:
+    value: int
+    id: Optional[int] = None
+
+
+class _FakeRepository(Repository[_Item]):
+    """Repositorio sin base de datos: guarda las filas copiadas y los commits."""
+    TABLE = "t"
+    COLUMNS = ("value",)
+    ID_COLUMN = "id"
+
+    def __init__(self) -> None:
+        # Sin super().__init__(): no se abre la conexión
+        self._pending = None
+        self._pending_size = 0
+        self.inserted: List[_Item] = []
+        self.copies: List[list] = []
+        self.commits = 0
+        self.next_id = 1
+
+    @contextlib.contextmanager
+    def connect(self, autocommit=True):
+        yield None
+        if autocommit:
+            self.commits += 1
+
+    def reserve_ids(self, cursor, table, column, count):
+        ids = list(range(self.next_id, self.next_id + count))
+        self.next_id += count
+        return ids
+
+    def copy_rows(self, cursor, table, columns, rows, batch_size=100000):
+        rows = list(rows)
+        self.copies.append(rows)
+        return len(rows)
+
+    def get(self, id):
+        raise NotImplementedError
+
+    def get_all(self):
+        raise NotImplementedError
+
+    def add(self, item: _Item) -> None:
+        if self._enqueue(item):
+            return
+        self.inserted.append(item)
+
+    def delete(self, id):
+        raise NotImplementedError
+
+
+def test_add_many_reserves_ids_and_copies_in_order():
+    repository = _FakeRepository()
+    items = [_Item(5), _Item(7)]
+
+    assert repository.add_many(items) == 2
+    assert [item.id for item in items] == [1, 2]
+    assert repository.copies == [[[5, 1], [7, 2]]]
+    assert repository.commits == 1
+
+
+def test_add_without_batch_inserts_immediately():
+    repository = _FakeRepository()
+
+    repository.add(_Item(1))
+
+    assert len(repository.inserted) == 1
+    assert repository.copies == []
+
+
+def test_batch_flushes_every_batch_size_and_on_exit():
+    repository = _FakeRepository()
+    items = [_Item(i) for i in range(5)]
+
+    with repository.batch(batch_size=2):
+        for item in items:
+            repository.add(item)
+        # Dos lotes completos escritos; el quinto sigue pendiente
+        assert [len(rows) for rows in repository.copies] == [2, 2]
+        assert items[4].id is None
+
+    assert [len(rows) for rows in repository.copies] == [2, 2, 1]
+    assert [item.id for item in items] == [1, 2, 3, 4, 5]
+    assert repository.inserted == []
+    assert repository._pending is None
+
+
+def test_nested_batch_accumulates_in_outer_one():
+    repository = _FakeRepository()
+
+    with repository.batch(batch_size=10):
+        with repository.batch(batch_size=1):
+            repository.add(_Item(1))
+        repository.add(_Item(2))
+        assert repository.copies == []
+
+    assert repository.copies == [[[1, 1], [2, 2]]]
+
+
+def test_batch_discards_pending_items_on_error():
+    repository = _FakeRepository()
+
+    with pytest.raises(RuntimeError):
+        with repository.batch(batch_size=10):
+            repository.add(_Item(1))
+            raise RuntimeError
+
+    assert repository.copies == []
+    assert repository._pending is None
+    # Cerrado el lote, add() vuelve a insertar directamente
+    repository.add(_Item(2))
+    assert len(repository.inserted) == 1
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "\\N"),
+    (True, "t"),
+    ("a\tb\\c", "a\\tb\\\\c"),
+    ({"k": None, "flag": True}, '{"k": null, "flag": true}'),
+    ([1, "a\tb"], '[1, "a\\\\tb"]'),
+    (1.5, "1.5"),
+])
+def test_copy_value(value, expected):
+    assert Repository._copy_value(value) == expected
@@ -0,0 +1,162 @@
+import struct
+
+import numpy as np
+import pytest
+from psycopg2.sql import SQL
+
+from src.crc.repositories.repository import Repository, _MatrixReader
+
+
+def _binary_copy(ids, values, extension: bytes = b"") -> bytes:
+    """Salida de COPY ... TO STDOUT (FORMAT binary) para filas (id int4, valores float8)."""
+    width = values.shape[1]
+    row_dtype = np.dtype(
+        [('count', '>i2'), ('id_length', '>i4'), ('id', '>i4')]
+        + [field for i in range(width) for field in ((f'length_{i}', '>i4'), (f'value_{i}', '>f8'))]
+    )
+    rows = np.empty(len(ids), dtype=row_dtype)
+    rows['count'] = width + 1
+    rows['id_length'] = 4
+    rows['id'] = ids
+    for i in range(width):
+        rows[f'length_{i}'] = 8
+        rows[f'value_{i}'] = values[:, i]
+
+    return _header(extension) + rows.tobytes() + b"\xff\xff"
+
+
+def _header(extension: bytes = b"") -> bytes:
+    return b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, 'big') + len(extension).to_bytes(4, 'big') + extension
+
+
+def _row(*fields) -> bytes:
+    """Fila del formato binario a partir de sus campos en bytes (None para un NULL)."""
+    data = struct.pack('>h', len(fields))
+    for field in fields:
+        data += struct.pack('>i', -1) if field is None else struct.pack('>i', len(field)) + field
+    return data
+
+
+def _feed(reader: _MatrixReader, data: bytes, piece: int) -> None:
+    for start in range(0, len(data), piece):
+        reader.write(data[start:start + piece])
+
+
+def test_matrix_reader_decodes_rows_split_across_blocks():
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, 41)
+    values = rng.normal(size=(40, 3))
+
+    reader = _MatrixReader(3, 40, np.float64)
+    # Bloques pequeños y trozos que no coinciden con las filas: cada bloque deja una fila a medias
+    reader.BLOCK_SIZE = 50
+    _feed(reader, _binary_copy(ids, values, extension=b"ext"), 7)
+    read_ids, matrix = reader.finish()
+
+    np.testing.assert_array_equal(read_ids, ids)
+    np.testing.assert_array_equal(matrix, values)
+
+
+def test_matrix_reader_grows_when_more_rows_arrive():
+    ids = np.arange(10, 35)
+    values = np.arange(25 * 2, dtype=np.float64).reshape(25, 2)
+
+    reader = _MatrixReader(2, 3, np.float32)
+    reader.BLOCK_SIZE = 64
+    _feed(reader, _binary_copy(ids, values), 13)
+    read_ids, matrix = reader.finish()
+
+    assert matrix.dtype == np.float32
+    np.testing.assert_array_equal(read_ids, ids)
+    np.testing.assert_array_equal(matrix, values.astype(np.float32))
+
+
+def test_matrix_reader_without_rows():
+    reader = _MatrixReader(2, 0, np.float64)
+    _feed(reader, _binary_copy(np.array([], dtype=np.int64), np.empty((0, 2))), 5)
+    read_ids, matrix = reader.finish()
+
+    assert read_ids.shape == (0,)
+    assert matrix.shape == (0, 2)
+
+
+def _read(data: bytes, width: int = 2):
+    reader = _MatrixReader(width, 4, np.float64)
+    reader.BLOCK_SIZE = 16
+    _feed(reader, data, 5)
+    return reader.finish()
+
+
+def test_matrix_reader_reads_hand_built_rows():
+    data = _header() + _row(struct.pack('>i', 3), struct.pack('>d', 1.5), struct.pack('>d', -2.0)) + b"\xff\xff"
+
+    ids, matrix = _read(data)
+
+    np.testing.assert_array_equal(ids, [3])
+    np.testing.assert_array_equal(matrix, [[1.5, -2.0]])
+
+
+@pytest.mark.parametrize("row", [
+    # Valor NULL: longitud -1 sin contenido
+    _row(struct.pack('>i', 3), None, struct.pack('>d', 1.0)),
+    # Id int8 en lugar de int4
+    _row(struct.pack('>q', 3), struct.pack('>d', 1.0), struct.pack('>d', 2.0)),
+    # Más columnas de las esperadas
+    _row(struct.pack('>i', 3), struct.pack('>d', 1.0), struct.pack('>d', 2.0), struct.pack('>d', 3.0)),
+])
+def test_matrix_reader_rejects_malformed_rows(row):
+    good = _row(struct.pack('>i', 1), struct.pack('>d', 1.0), struct.pack('>d', 2.0))
+
+    with pytest.raises(ValueError):
+        _read(_header() + good + row + good + b"\xff\xff")
+
+
+def test_matrix_reader_rejects_truncated_output():
+    row = _row(struct.pack('>i', 1), struct.pack('>d', 1.0), struct.pack('>d', 2.0))
+
+    with pytest.raises(ValueError):
+        _read(_header() + row + row[:7])
+
+
+def test_matrix_reader_rejects_text_output():
+    with pytest.raises(ValueError):
+        _read(b"1\t1.0\t2.0\n" * 4)
+
+
+class _CopyCursor:
+    """Cursor que devuelve una salida de COPY fija y guarda la consulta recibida."""
+
+    def __init__(self, output: str):
+        self.output = output
+        self.query = None
+
+    def copy_expert(self, query, buffer):
+        self.query = query
+        buffer.write(self.output)
+
+
+def _copy_out_text(output: str):
+    cursor = _CopyCursor(output)
+    # copy_out_text solo usa el cursor: no hace falta un repositorio conectado
+    column = Repository.copy_out_text(None, cursor, SQL("SELECT name FROM t ORDER BY id"))
+    return column, cursor.query
+
+
+def test_copy_out_text_keeps_nulls_aligned():
+    # Salida de PostgreSQL con FORCE_QUOTE * para 'a', NULL (vacío tras COALESCE), 'b,c' y 'd"e'
+    column, query = _copy_out_text('"a"\n""\n"b,c"\n"d""e"\n')
+
+    assert "COALESCE" in query and "FORCE_QUOTE" in query
+    assert list(column) == ["a", "", "b,c", 'd"e']
+
+
+def test_copy_out_text_with_only_nulls():
+    column, _ = _copy_out_text('""\n""\n""\n')
+
+    assert list(column) == ["", "", ""]
+
+
+def test_copy_out_text_without_rows():
+    column, _ = _copy_out_text("")
+
+    assert column.shape == (0,)
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from src.exceptions.exceptions import NotEnoughVariablesException, NoTargetException
+from src.source.entities.source_data_entity import SourceData
+from src.source.manager.source_data_access import SourceDataAccess
+from src.utils.utils import Utils
+
+
+def _source_data(values, is_target, target_labels=(), categorical_target=False) -> SourceData:
+    values = np.array(values, dtype=np.float64)
+    points, features = values.shape
+    return SourceData(
+        point_ids=np.arange(1, points + 1, dtype=np.int64),
+        point_names=np.array([f"p{i}" for i in range(points)], dtype=str),
+        feature_ids=np.arange(10, 10 + features, dtype=np.int64),
+        feature_names=np.array([f"f{i}" for i in range(features)], dtype=str),
+        is_target=np.array(is_target, dtype=bool),
+        values=values,
+        target_labels=np.array(target_labels, dtype=str),
+        categorical_target=np.array(categorical_target),
+        class_ids=np.array([1, 2], dtype=np.int64),
+        class_names=np.array(["a", "b"], dtype=str)
+    )
+
+
+@pytest.fixture
+def numeric_target():
+    # Dos características y un objetivo numérico binario (última columna)
+    return _source_data([[1.0, 0.0, 1.0], [2.0, 1.0, 0.0], [3.0, 1.0, 1.0]], [False, False, True],
+                        target_labels=["1", "0", "1"])
+
+
+def test_numeric_includes_numeric_target(numeric_target):
+    view = SourceDataAccess._numeric(numeric_target)
+
+    assert view["features"].dtype == Utils.get_matrix_dtype()
+    np.testing.assert_array_equal(view["features"], numeric_target.values)
+    np.testing.assert_array_equal(view["feature_ids"], [10, 11, 12])
+    np.testing.assert_array_equal(view["point_ids"], [1, 2, 3])
+
+
+def test_numeric_excludes_categorical_target():
+    data = _source_data([[1.0, 2.0, np.nan], [3.0, 4.0, np.nan]], [False, False, True],
+                        target_labels=["a", "b"], categorical_target=True)
+
+    np.testing.assert_array_equal(SourceDataAccess._numeric(data)["feature_ids"], [10, 11])
+
+
+def test_numeric_requires_two_features():
+    data = _source_data([[1.0, np.nan], [2.0, np.nan]], [False, True], target_labels=["a", "b"], categorical_target=True)
+
+    with pytest.raises(NotEnoughVariablesException):
+        SourceDataAccess._numeric(data)
+
+
+def test_with_target_splits_features_and_target(numeric_target):
+    view = SourceDataAccess._with_target(numeric_target)
+
+    assert view["features"].dtype == np.float64
+    np.testing.assert_array_equal(view["features"], numeric_target.values[:, :2])
+    np.testing.assert_array_equal(view["target"], [1.0, 0.0, 1.0])
+    np.testing.assert_array_equal(view["feature_ids"], [10, 11])
+
+
+def test_with_target_uses_labels_of_categorical_target():
+    data = _source_data([[1.0, np.nan], [2.0, np.nan]], [False, True], target_labels=["a", "b"], categorical_target=True)
+
+    np.testing.assert_array_equal(SourceDataAccess._with_target(data)["target"], ["a", "b"])
+
+
+def test_with_target_without_target():
+    data = _source_data([[1.0, 2.0]], [False, False])
+
+    with pytest.raises(NoTargetException):
+        SourceDataAccess._with_target(data)
+
+
+def test_classification_view(numeric_target):
+    X, target, features, classes = SourceDataAccess._classification(numeric_target)
+
+    np.testing.assert_array_equal(X, numeric_target.values[:, :2])
+    np.testing.assert_array_equal(target, ["1", "0", "1"])
+    assert features == [{'id_feature': 10, 'name': 'f0'}, {'id_feature': 11, 'name': 'f1'}]
+    assert classes == [{'id_prediction': 1, 'name': 'a'}, {'id_prediction': 2, 'name': 'b'}]
+
+
+def test_classification_rejects_non_binary_numeric_target():
+    data = _source_data([[1.0, 0.0], [2.0, 1.0], [3.0, 2.0]], [False, True], target_labels=["0", "1", "2"])
+
+    with pytest.raises(ValueError):
+        SourceDataAccess._classification(data)
+
+
+def test_binary_keeps_only_zero_one_columns(numeric_target):
+    matrix, features = SourceDataAccess._binary(numeric_target)
+
+    # f0 tiene valores distintos de 0 y 1; f1 y el objetivo numérico son binarios
+    assert matrix.dtype == bool
+    np.testing.assert_array_equal(matrix, numeric_target.values[:, 1:] == 1)
+    assert [f['id_feature'] for f in features] == [11, 12]
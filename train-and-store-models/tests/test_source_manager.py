@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.source.entities.feature_entity import Feature
+from src.source.manager.source_manager import SourceManager
+
+
+def test_melt_values_one_row_per_point_and_feature():
+    df = pd.DataFrame({
+        "x": [1.5, 2.0, np.nan],
+        "label": ["a", 3, None],
+    })
+    features = [
+        Feature(id_source=4, name="x", is_target=False, id=10),
+        Feature(id_source=4, name="label", is_target=True, id=11),
+    ]
+
+    melted = SourceManager._melt_values(4, df, [100, 101, 102], features)
+
+    assert list(melted.columns) == ["id_source", "id_point", "id_feature", "numeric_value", "string_value"]
+    assert (melted["id_source"] == 4).all()
+    # Primero todos los puntos de la primera característica, después los de la segunda
+    assert list(melted["id_point"]) == [100, 101, 102, 100, 101, 102]
+    assert list(melted["id_feature"]) == [10, 10, 10, 11, 11, 11]
+
+    numeric = melted["numeric_value"].to_numpy()
+    np.testing.assert_array_equal(numeric[:3], [1.5, 2.0, np.nan])
+    # Columna no numérica: los números van a numeric_value y las cadenas a string_value
+    np.testing.assert_array_equal(numeric[3:], [np.nan, 3.0, np.nan])
+    strings = melted["string_value"]
+    assert strings[3] == "a"
+    assert strings.drop(index=3).isna().all()
+
+
+def test_melt_values_without_rows():
+    df = pd.DataFrame({"x": pd.Series([], dtype=float)})
+    features = [Feature(id_source=1, name="x", is_target=False, id=5)]
+
+    melted = SourceManager._melt_values(1, df, [], features)
+
+    assert len(melted) == 0
+
+
+def test_get_sampling_without_method():
+    assert SourceManager._get_sampling({}) is None
+
+
+def test_get_sampling_tablesample():
+    sampling = SourceManager._get_sampling({"sample_method": "system", "sample_fraction": 0.5, "seed": 4})
+
+    assert sampling == {"method": "system", "fraction": 0.5, "seed": 4}
+
+
+def test_get_sampling_hash_uses_default_seed():
+    assert SourceManager._get_sampling({"sample_method": "hash", "sample_size": 10}) == {
+        "method": "hash", "size": 10, "seed": 0
+    }
+
+
+@pytest.mark.parametrize("parameters", [
+    {"sample_method": "bernoulli", "sample_fraction": 0},
+    {"sample_method": "bernoulli", "sample_fraction": 1.5},
+    {"sample_method": "system", "sample_fraction": True},
+    {"sample_method": "hash", "sample_size": 0},
+    {"sample_method": "hash", "sample_size": 10, "seed": 1.5},
+    {"sample_method": "reservoir", "sample_size": 10},
+])
+def test_get_sampling_rejects_invalid_parameters(parameters):
+    with pytest.raises(ValueError):
+        SourceManager._get_sampling(parameters)
@@ -0,0 +1,69 @@
+import re
+
+from psycopg2.sql import SQL, Composed, Identifier, Literal
+
+from src.source.manager.table_loader import TableLoader
+
+COLUMNS = [("x", "numeric"), ("flag", "boolean"), ("label", "text")]
+
+
+def _render(query) -> str:
+    """Texto de una consulta de psycopg2.sql sin conexión, con los espacios normalizados."""
+    def render(part) -> str:
+        if isinstance(part, Composed):
+            return "".join(render(p) for p in part.seq)
+        if isinstance(part, SQL):
+            return part.string
+        if isinstance(part, Identifier):
+            return ".".join(f'"{s}"' for s in part.strings)
+        if isinstance(part, Literal):
+            return repr(part.wrapped)
+        raise TypeError(type(part))
+
+    return re.sub(r"\s+", " ", render(query)).strip()
+
+
+def test_build_select_converts_booleans_and_filters_nulls():
+    query = _render(TableLoader().build_select("s.t", COLUMNS))
+
+    assert query.startswith('SELECT rn, "x", "flag"::integer AS "flag", "label" FROM')
+    assert "row_number() OVER () AS rn" in query
+    assert 'FROM "s"."t"' in query
+    assert query.endswith('WHERE "x" IS NOT NULL AND "flag" IS NOT NULL AND "label" IS NOT NULL')
+
+
+def test_build_select_with_watermark_bounds_numbers_rows_in_watermark_order():
+    query = _render(TableLoader().build_select("s.t", COLUMNS, bounds=("updated", "5", "9")))
+
+    assert "row_number() OVER (ORDER BY \"updated\")" in query
+    assert "WHERE \"updated\" IS NOT NULL AND \"updated\" > '5' AND \"updated\" <= '9'" in query
+
+
+def test_build_select_with_open_lower_bound():
+    # En la creación solo hay límite superior: la marca de agua leída antes de cargar
+    query = _render(TableLoader().build_select("s.t", COLUMNS, bounds=("updated", None, "9")))
+
+    assert "\"updated\" >" not in query
+    assert "\"updated\" <= '9'" in query
+
+
+def test_build_select_with_tablesample():
+    sampling = {"method": "bernoulli", "fraction": 0.25, "seed": 7}
+    query = _render(TableLoader().build_select("s.t", COLUMNS, sampling=sampling))
+
+    assert 'FROM "s"."t" AS t TABLESAMPLE BERNOULLI (25.0) REPEATABLE (7)' in query
+
+
+def test_build_select_with_hash_sample():
+    sampling = {"method": "hash", "size": 100, "seed": 3}
+    query = _render(TableLoader().build_select("s.t", COLUMNS, sampling=sampling))
+
+    assert "(SELECT * FROM \"s\".\"t\" AS t ORDER BY md5(t::text || '3') LIMIT 100) AS t" in query
+
+
+def test_build_select_with_block_range():
+    query = _render(TableLoader().build_select("s.t", COLUMNS, blocks=(8, 16)))
+
+    assert "(SELECT * FROM \"s\".\"t\" WHERE ctid >= '(8,0)'::tid AND ctid < '(16,0)'::tid) AS t" in query
+    # Las filas se numeran dentro del rango: el desplazamiento global lo añade cada proceso
+    assert "row_number() OVER () AS rn" in query